@@ -0,0 +1,77 @@
+# bench_pdf_render_engines.py
+"""
+Benchmark the PDF render engines of generate_pdf_report
+
+Renders the same synthetic orders with the default platypus engine and with
+the canvas engine, reporting the time and page count of each report.
+
+Usage:
+    python benchmarks/bench_pdf_render_engines.py [--rows 5000 20000 50000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path for local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from utils.report_utils import generate_pdf_report
+
+REPORT_CONFIG = {
+    "description": "Render engine benchmark",
+    "summary_fields": [
+        {"field": "TotalValue", "operation": "sum", "label": "Total Revenue"},
+        {"field": "Status", "operation": "group", "label": "Orders by Status"}
+    ]
+}
+
+
+def make_orders(rows):
+    """
+    Build a DataFrame of synthetic order records
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "OrderId": [f"ORD{i:08d}" for i in range(rows)],
+        "OrderDate": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%dT%H:%M:%S"),
+        "CustomerName": rng.choice(["Acme Corp", "Globex", "Initech", "Umbrella Corporation International"], rows),
+        "Status": rng.choice(["Open", "Shipped", "Cancelled"], rows),
+        "TotalItems": rng.integers(1, 5000, rows),
+        "TotalValue": rng.random(rows) * 10000,
+    })
+
+
+def count_pages(pdf_file):
+    """
+    Number of pages in a PDF file, or None without pypdf
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return len(PdfReader(pdf_file).pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 20000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'engine':>10} {'pages':>7} {'time (s)':>9}")
+    for rows in args.rows:
+        frame = make_orders(rows)
+        for engine in ("platypus", "canvas"):
+            report_config = dict(REPORT_CONFIG, report_id=f"bench_{engine}", render_engine=engine)
+            started = time.perf_counter()
+            pdf_file = generate_pdf_report("Render Engine Benchmark", frame, report_config, datetime(2024, 1, 1))
+            elapsed = time.perf_counter() - started
+            print(f"{rows:>8} {engine:>10} {count_pages(pdf_file) or '-':>7} {elapsed:>9.2f}")
+            os.remove(pdf_file)
+
+
+if __name__ == "__main__":
+    main()
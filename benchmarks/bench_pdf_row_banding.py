@@ -0,0 +1,87 @@
+# bench_pdf_row_banding.py
+"""
+Benchmark the cost of zebra striping in the PDF detail tables
+
+Compares the previous striping, one BACKGROUND style command per even row,
+with a single ROWBACKGROUNDS rule. For each row count it reports the number
+of style commands and the time to lay out and render one table, so a style
+cost that grows with the row count shows up as a rising time per row.
+
+Usage:
+    python benchmarks/bench_pdf_row_banding.py [--rows 1000 2000 5000]
+"""
+import argparse
+import io
+import time
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+FIELDS = ["OrderId", "OrderDate", "CustomerName", "Status", "TotalItems", "TotalValue"]
+
+BASE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+]
+
+
+def make_rows(rows):
+    """
+    Build formatted table rows of synthetic orders
+    """
+    return [
+        [f"ORD{i:08d}", "2024-01-01T00:00:00", "Acme Corp", "Shipped", f"{i % 5000:,}", f"{i * 1.5:,.2f}"]
+        for i in range(rows)
+    ]
+
+
+def per_row_style(rows):
+    """
+    Striping with one BACKGROUND command per even row, as previously done
+    """
+    style = TableStyle(BASE_STYLE)
+    for i in range(1, rows + 1):
+        if i % 2 == 0:
+            style.add('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
+    return style
+
+
+def row_backgrounds_style(rows):
+    """
+    Striping with a single ROWBACKGROUNDS rule
+    """
+    return TableStyle(BASE_STYLE + [('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])])
+
+
+def render(table_rows, style):
+    """
+    Time building a PDF holding one table with the given style, in seconds
+    """
+    started = time.perf_counter()
+    table = Table([FIELDS] + table_rows, repeatRows=1)
+    table.setStyle(style)
+    SimpleDocTemplate(io.BytesIO(), pagesize=landscape(letter)).build([table])
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 2000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'style':>16} {'commands':>9} {'time (s)':>9} {'us/row':>8}")
+    for rows in args.rows:
+        table_rows = make_rows(rows)
+        for name, build_style in (("per-row", per_row_style), ("ROWBACKGROUNDS", row_backgrounds_style)):
+            style = build_style(rows)
+            elapsed = render(table_rows, style)
+            print(f"{rows:>8} {name:>16} {len(style.getCommands()):>9} {elapsed:>9.2f} {elapsed / rows * 1e6:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# bench_pdf_table_formatting.py
+"""
+Benchmark the detail table cell formatting of generate_pdf_report
+
+Compares the previous row-by-row formatting (df.iterrows() with per-cell
+isinstance checks) against the column-wise format_table_rows().
+
+Usage:
+    python benchmarks/bench_pdf_table_formatting.py [--rows 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path for local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from utils.report_utils import format_table_rows
+
+FIELDS = ["OrderId", "OrderDate", "CustomerName", "Status", "TotalItems", "TotalValue"]
+
+
+def make_orders(rows):
+    """
+    Build a DataFrame of synthetic order records
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "OrderId": [f"ORD{i:08d}" for i in range(rows)],
+        "OrderDate": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%dT%H:%M:%S"),
+        "CustomerName": rng.choice(["Acme Corp", "Globex", "Initech", "Umbrella"], rows),
+        "Status": rng.choice(["Open", "Shipped", "Cancelled"], rows),
+        "TotalItems": rng.integers(1, 5000, rows),
+        "TotalValue": rng.random(rows) * 10000,
+    })
+
+
+def format_rows_iterrows(frame, fields):
+    """
+    Row-by-row formatting as previously done in generate_pdf_report
+    """
+    table_data = []
+    for _, row in frame.iterrows():
+        table_row = []
+        for field in fields:
+            value = row.get(field, "")
+            if isinstance(value, (int, float)):
+                if isinstance(value, float):
+                    formatted_value = f"{value:,.2f}"
+                else:
+                    formatted_value = f"{value:,}"
+            else:
+                formatted_value = str(value)
+            table_row.append(formatted_value)
+        table_data.append(table_row)
+    return table_data
+
+
+def best_of(function, repeat):
+    """
+    Best wall-clock time of several runs, in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'iterrows (s)':>14} {'column-wise (s)':>16} {'speedup':>9}")
+    for rows in args.rows:
+        frame = make_orders(rows)
+        baseline = best_of(lambda: format_rows_iterrows(frame, FIELDS), args.repeat)
+        vectorized = best_of(lambda: format_table_rows(frame, FIELDS), args.repeat)
+        print(f"{rows:>10} {baseline:>14.3f} {vectorized:>16.3f} {baseline / vectorized:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,20 @@ import json
 import logging
 import os
 import sys
+from itertools import chain, islice
 
 
 
 # Add project root to path for local imports
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from utils.report_utils import query_order_api, generate_pdf_report
+from utils.report_utils import (
+    iter_order_pages, clear_fetch_checkpoint, generate_pdf_report, report_columns,
+    write_columnar_results, read_columnar_metadata, read_columnar_results, open_arrow_results,
+    write_ndjson_spool, read_ndjson_metadata, read_ndjson_spool, iter_ndjson_spool,
+    build_query_plan, query_plan_key, select_report_records,
+    update_order_store, iter_store_pages, store_search_pages,
+    fill_order_store, report_date_range
+)
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +33,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger("dynamic_report_generator")
 
+# File extensions of the supported NDJSON spool compressions
+SPOOL_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Records per page when re-paging a shared fetch for one report
+SHARED_PAGE_SIZE = 1000
+
 # Define default arguments for the DAG
 default_args = {
     'owner': 'airflow',
@@ -35,6 +49,48 @@ default_args = {
     'retry_delay': timedelta(minutes=5),
 }
 
+# Function to load the configurations of the active reports
+def load_active_report_configs():
+    """
+    Load the configuration of every active report, keyed by report id
+    """
+    active_report_ids = json.loads(Variable.get("active_report_ids", "[]"))
+    return {
+        report_id: json.loads(Variable.get(f"report_config_{report_id}"))
+        for report_id in active_report_ids
+    }
+
+# Function to check whether a report is assembled from the local order store
+def uses_order_store(report_config):
+    """
+    Incremental and multi-day window reports are built from the local order store,
+    and "store_orders" reports write their fetched orders to it
+    """
+    return bool(
+        report_config.get("incremental")
+        or report_config.get("window")
+        or report_config.get("store_orders")
+    )
+
+# Function to find fetches shared by several reports
+def get_shared_fetches(report_configs):
+    """
+    Query plan entries that serve more than one report with a single fetch
+    
+    Reports that read or write the local order store fetch on their own, so
+    that their orders always reach the store; they are left out.
+    """
+    report_configs = {
+        report_id: report_config
+        for report_id, report_config in report_configs.items()
+        if not uses_order_store(report_config)
+    }
+    return {
+        fetch_key: entry
+        for fetch_key, entry in build_query_plan(report_configs).items()
+        if len(entry["report_ids"]) > 1
+    }
+
 # Function to get active report configurations
 def get_active_reports(**kwargs):
     """
@@ -48,13 +104,62 @@ def get_active_reports(**kwargs):
         
         logger.info(f"Found {len(active_report_ids)} active reports: {active_report_ids}")
         
+        # Shared fetches run first; reports without one fall back to fetching on their own
+        try:
+            shared_fetch_tasks = [f"fetch_shared_{fetch_key}" for fetch_key in get_shared_fetches(load_active_report_configs())]
+        except Exception as e:
+            logger.warning(f"Could not plan shared fetches, reports will fetch individually: {str(e)}")
+            shared_fetch_tasks = []
+        
         # Return task IDs corresponding to each report
-        return [f"process_report_{report_id}" for report_id in active_report_ids]
+        return shared_fetch_tasks + [f"process_report_{report_id}" for report_id in active_report_ids]
     
     except Exception as e:
         logger.error(f"Error retrieving active reports: {str(e)}")
         return ['no_active_reports']
 
+# Function to write query results without holding them all in memory
+def write_result_file(result_file, metadata, records):
+    """
+    Write the result file as a JSON object, streaming the "data" array record by record
+    """
+    record_count = 0
+    with open(result_file, 'w') as f:
+        f.write(json.dumps(metadata)[:-1] + ', "data": [')
+        for record in records:
+            if record_count:
+                f.write(', ')
+            json.dump(record, f)
+            record_count += 1
+        f.write(']}')
+    
+    return record_count
+
+# Function to run one fetch on behalf of several reports
+def fetch_shared_data(fetch_key, **kwargs):
+    """
+    Fetch the superset of records needed by all reports sharing a query plan entry
+    """
+    execution_date = kwargs['execution_date']
+    
+    entry = get_shared_fetches(load_active_report_configs())[fetch_key]
+    
+    # Calculate date range (yesterday to execution date)
+    from_date, to_date = report_date_range(execution_date, entry["config"])
+    
+    logger.info(f"[shared {fetch_key}] Searching from {from_date} to {to_date} for reports {entry['report_ids']}")
+    
+    spool_file = f"/tmp/shared_{fetch_key}_{execution_date.strftime('%Y%m%d')}.ndjson"
+    checkpoint_dir = f"/tmp/shared_{fetch_key}_checkpoint_{execution_date.strftime('%Y%m%d')}"
+    record_count = write_ndjson_spool(
+        spool_file,
+        iter_order_pages(from_date, to_date, entry["config"], checkpoint_dir=checkpoint_dir)
+    )
+    clear_fetch_checkpoint(checkpoint_dir)
+    
+    logger.info(f"[shared {fetch_key}] Wrote {record_count} records to {spool_file}")
+    return spool_file
+
 # Function to query the API for a specific report
 def query_report_data(report_id, **kwargs):
     """
@@ -70,24 +175,64 @@ def query_report_data(report_id, **kwargs):
         logger.error(f"Error loading configuration for report {report_id}: {str(e)}")
         raise
     
-    # Calculate date range (yesterday to execution date)
-    to_date = execution_date.strftime("%d %b %Y")
-    from_date = (execution_date - timedelta(days=1)).strftime("%d %b %Y")
+    # Calculate the date range of the report's window (yesterday to execution date by default)
+    from_date, to_date = report_date_range(execution_date, report_config)
     
     logger.info(f"[{report_id}] Searching from {from_date} to {to_date}")
     
-    # Query the API using the utility function
-    results = query_order_api(from_date, to_date, report_config)
+    # Stream the API results straight into a temporary file, checkpointing pages
+    # so that a task retry only fetches the pages the failed attempt was missing
+    handoff_format = report_config.get("handoff_format", "ndjson")
+    if handoff_format not in ("ndjson", "json", "parquet", "arrow"):
+        raise Exception(f"Unknown handoff format for report {report_id}: {handoff_format}")
     
-    # Create a temporary file to store the results
-    result_file = f"/tmp/{report_id}_results_{execution_date.strftime('%Y%m%d')}.json"
-    with open(result_file, 'w') as f:
-        json.dump({
-            "report_id": report_id,
-            "config": report_config,
-            "data": results,
-            "executed_at": execution_date.isoformat()
-        }, f)
+    result_file = f"/tmp/{report_id}_results_{execution_date.strftime('%Y%m%d')}.{handoff_format}"
+    if handoff_format == "ndjson" and report_config.get("spool_compression"):
+        result_file += SPOOL_EXTENSIONS[report_config["spool_compression"]]
+    checkpoint_dir = f"/tmp/{report_id}_checkpoint_{execution_date.strftime('%Y%m%d')}"
+    metadata = {
+        "report_id": report_id,
+        "config": report_config,
+        "executed_at": execution_date.isoformat()
+    }
+    
+    # Incremental reports only fetch orders newer than their watermark into the
+    # local order store, and window reports only the days the store is missing;
+    # otherwise use the shared fetch for this report's query plan entry if one ran
+    shared_file = None
+    if not uses_order_store(report_config):
+        shared_file = kwargs['ti'].xcom_pull(task_ids=f"fetch_shared_{query_plan_key(report_config)}")
+    
+    if report_config.get("incremental"):
+        query_key = update_order_store(report_id, from_date, to_date, report_config)
+        pages = iter_store_pages(query_key, from_date, to_date, report_config)
+    elif report_config.get("window"):
+        query_key = fill_order_store(from_date, to_date, report_config)
+        pages = iter_store_pages(query_key, from_date, to_date, report_config)
+    elif shared_file:
+        logger.info(f"[{report_id}] Using shared fetch results from {shared_file}")
+        records = select_report_records(iter_ndjson_spool(shared_file), report_config)
+        pages = iter(lambda: list(islice(records, SHARED_PAGE_SIZE)), [])
+    elif report_config.get("store_orders"):
+        # Keep the fetched orders in the local order store as well
+        pages = store_search_pages(from_date, to_date, report_config, checkpoint_dir=checkpoint_dir)
+    else:
+        pages = iter_order_pages(from_date, to_date, report_config, checkpoint_dir=checkpoint_dir)
+    
+    if handoff_format == "ndjson":
+        # Each page is flushed to the spool as soon as it arrives
+        record_count = write_ndjson_spool(result_file, pages, metadata)
+    elif handoff_format == "json":
+        record_count = write_result_file(result_file, metadata, chain.from_iterable(pages))
+    else:
+        record_count = write_columnar_results(
+            result_file, pages, metadata, handoff_format,
+            columns=report_columns(report_config),
+            column_types=report_config.get("column_types")
+        )
+    clear_fetch_checkpoint(checkpoint_dir)
+    
+    logger.info(f"[{report_id}] Wrote {record_count} records to {result_file}")
     
     # Return the path to the result file
     return result_file
@@ -106,12 +251,23 @@ def generate_report_pdf(report_id, **kwargs):
     
     logger.info(f"[{report_id}] Generating PDF report from {result_file}")
     
-    # Load the results and configuration
-    with open(result_file, 'r') as f:
-        result_data = json.load(f)
-    
-    report_config = result_data["config"]
-    results = result_data["data"]
+    # Load the results and configuration; spools and columnar files only load the columns the report renders
+    if ".ndjson" in result_file:
+        report_config = read_ndjson_metadata(result_file)["config"]
+        results = read_ndjson_spool(result_file, columns=report_columns(report_config))
+    elif result_file.endswith(".json"):
+        with open(result_file, 'r') as f:
+            result_data = json.load(f)
+        
+        report_config = result_data["config"]
+        results = result_data["data"]
+    elif result_file.endswith(".arrow"):
+        # Memory-mapped: summaries and table rows are computed from the column buffers
+        report_config = read_columnar_metadata(result_file)["config"]
+        results = open_arrow_results(result_file, columns=report_columns(report_config))
+    else:
+        report_config = read_columnar_metadata(result_file)["config"]
+        results = read_columnar_results(result_file, columns=report_columns(report_config))
     
     # Generate the PDF using the utility function
     pdf_file = generate_pdf_report(
@@ -148,6 +304,9 @@ def prepare_email(report_id, **kwargs):
     subject = email_config.get("subject", "Report").format(date=execution_date.strftime('%Y-%m-%d'))
     body = email_config.get("body", "Please find attached the requested report.")
     
+    from_date, to_date = report_date_range(execution_date, report_config)
+    date_range = f"{datetime.strptime(from_date, '%d %b %Y').strftime('%Y-%m-%d')} to {datetime.strptime(to_date, '%d %b %Y').strftime('%Y-%m-%d')}"
+    
     if not recipients:
         logger.warning(f"[{report_id}] No recipients configured for report, using default")
         recipients = Variable.get("default_report_recipients", "admin@example.com").split(',')
@@ -159,7 +318,8 @@ def prepare_email(report_id, **kwargs):
         "file_path": pdf_file,
         "recipients": recipients,
         "subject": subject,
-        "body": body
+        "body": body,
+        "date_range": date_range
     }
 
 # Create the DAG
@@ -205,6 +365,26 @@ try:
 except:
     active_report_ids = []
 
+# Plan fetches shared by several reports, so overlapping reports cost one API search
+try:
+    shared_fetches = get_shared_fetches(load_active_report_configs())
+except:
+    shared_fetches = {}
+
+shared_fetch_tasks = {}
+for fetch_key, entry in shared_fetches.items():
+    shared_fetch_task = PythonOperator(
+        task_id=f"fetch_shared_{fetch_key}",
+        python_callable=fetch_shared_data,
+        op_kwargs={"fetch_key": fetch_key},
+        provide_context=True,
+        dag=dag,
+    )
+    branching >> shared_fetch_task
+    
+    for shared_report_id in entry["report_ids"]:
+        shared_fetch_tasks[shared_report_id] = shared_fetch_task
+
 # Create task groups for each report
 for report_id in active_report_ids:
     with TaskGroup(group_id=f"process_report_{report_id}", dag=dag) as report_group:
@@ -255,7 +435,7 @@ for report_id in active_report_ids:
                     <div class="content">
                         <p>{{ ti.xcom_pull(task_ids='prepare_email_""" + report_id + """')['body'] }}</p>
                         <div class="note">
-                            <p><strong>Report Date Range:</strong> {{ (execution_date - macros.timedelta(days=1)).strftime('%Y-%m-%d') }} to {{ execution_date.strftime('%Y-%m-%d') }}</p>
+                            <p><strong>Report Date Range:</strong> {{ ti.xcom_pull(task_ids='prepare_email_""" + report_id + """')['date_range'] }}</p>
                             <p><strong>Generated On:</strong> {{ execution_date.strftime('%Y-%m-%d %H:%M:%S') }}</p>
                         </div>
                     </div>
@@ -273,4 +453,8 @@ for report_id in active_report_ids:
         query_task >> pdf_task >> email_prep_task >> email_task
     
     # Connect group to branching and end tasks
-    branching >> report_group >> end
\ No newline at end of file
+    branching >> report_group >> end
+    
+    # Reports served by a shared fetch wait for it
+    if report_id in shared_fetch_tasks:
+        shared_fetch_tasks[report_id] >> report_group
\ No newline at end of file
@@ -14,6 +14,11 @@ from reportlab.lib.pagesizes import letter, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from airflow.utils.dates import days_ago
+import sys
+
+# Add project root to path for local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from utils.report_utils import write_columnar_results, read_columnar_records
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +27,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("order_report_service")
 
+# Columns the PDF task reads from the query results
+REPORT_COLUMNS = ["OrderId", "OrderDate", "CustomerName", "Status", "TotalItems", "TotalValue"]
+
 # Define default arguments for the DAG
 default_args = {
     'owner': 'airflow',
@@ -158,10 +166,20 @@ def query_order_api(**kwargs):
     
     logger.info(f"Total orders retrieved: {len(all_results)}")
     
-    # Create a temporary file to store the results
-    result_file = f"/tmp/order_results_{execution_date.strftime('%Y%m%d')}.json"
-    with open(result_file, 'w') as f:
-        json.dump(all_results, f)
+    # Create a temporary file to store the results, optionally in a columnar format
+    handoff_format = Variable.get("order_report_handoff_format", "json")
+    if handoff_format not in ("json", "parquet", "arrow"):
+        raise Exception(f"Unknown order report handoff format: {handoff_format}")
+    result_file = f"/tmp/order_results_{execution_date.strftime('%Y%m%d')}.{handoff_format}"
+    if handoff_format == "json":
+        with open(result_file, 'w') as f:
+            json.dump(all_results, f)
+    else:
+        write_columnar_results(
+            result_file, [all_results], {}, handoff_format,
+            columns=REPORT_COLUMNS,
+            column_types={"TotalItems": "int64", "TotalValue": "float64"}
+        )
     
     # Return the path to the result file for the next task
     return result_file
@@ -180,9 +198,12 @@ def generate_pdf_report(**kwargs):
     
     logger.info(f"Generating PDF report from {result_file}")
     
-    # Load the results
-    with open(result_file, 'r') as f:
-        results = json.load(f)
+    # Load the results; columnar files only load the columns used below
+    if result_file.endswith(".json"):
+        with open(result_file, 'r') as f:
+            results = json.load(f)
+    else:
+        results = read_columnar_records(result_file, columns=REPORT_COLUMNS)
     
     if not results:
         logger.warning("No results found for report generation")
@@ -285,13 +306,10 @@ def generate_pdf_report(**kwargs):
         ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
         ('GRID', (0, 0), (-1, -1), 1, colors.black),
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        # Add a zebra striping pattern
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
     ])
     
-    # Add a zebra striping pattern
-    for i in range(1, len(report_data)):
-        if i % 2 == 0:
-            table_style.add('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-    
     table.setStyle(table_style)
     elements.append(table)
     
@@ -0,0 +1,95 @@
+# report_backfill_dag.py
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from airflow.utils.dates import days_ago
+from airflow.models import Variable
+import json
+import logging
+import os
+import sys
+
+# Add project root to path for local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from utils.report_utils import (
+    backfill_order_store,
+    DEFAULT_BACKFILL_REQUESTS_PER_SECOND, DEFAULT_BACKFILL_CONCURRENCY
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("report_backfill")
+
+# Define default arguments for the DAG
+default_args = {
+    'owner': 'airflow',
+    'depends_on_past': False,
+    'email_on_failure': True,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=5),
+}
+
+# Function to backfill the order store for a report
+def run_backfill(**kwargs):
+    """
+    Load a report's orders for a historical date range into the local order store
+    """
+    params = kwargs['params']
+    report_id = params["report_id"]
+
+    if not report_id or not params["from_date"] or not params["to_date"]:
+        raise Exception("Backfill requires report_id, from_date and to_date")
+
+    # Load report configuration
+    try:
+        report_config = json.loads(Variable.get(f"report_config_{report_id}"))
+    except Exception as e:
+        logger.error(f"Error loading configuration for report {report_id}: {str(e)}")
+        raise
+
+    # Dates are given as YYYY-MM-DD
+    from_date = datetime.strptime(params["from_date"], "%Y-%m-%d").strftime("%d %b %Y")
+    to_date = datetime.strptime(params["to_date"], "%Y-%m-%d").strftime("%d %b %Y")
+
+    logger.info(f"[{report_id}] Backfilling orders from {from_date} to {to_date}")
+
+    summary = backfill_order_store(
+        from_date,
+        to_date,
+        report_config,
+        max_requests_per_second=float(params["max_requests_per_second"]),
+        concurrency=int(params["concurrency"])
+    )
+
+    logger.info(f"[{report_id}] Backfill complete: {summary}")
+    return summary
+
+# Create the DAG
+dag = DAG(
+    'report_backfill',
+    default_args=default_args,
+    description='Backfill the local order store for a report over a historical date range',
+    schedule_interval=None,  # Triggered manually with a config
+    start_date=days_ago(1),
+    catchup=False,
+    params={
+        "report_id": "",
+        "from_date": "",
+        "to_date": "",
+        "max_requests_per_second": DEFAULT_BACKFILL_REQUESTS_PER_SECOND,
+        "concurrency": DEFAULT_BACKFILL_CONCURRENCY,
+    },
+    tags=['report', 'backfill'],
+)
+
+# Task: Backfill the order store
+task_backfill = PythonOperator(
+    task_id='backfill_order_store',
+    python_callable=run_backfill,
+    provide_context=True,
+    dag=dag,
+)
@@ -13,7 +13,7 @@ import sys
 
 # Add project root to path for local imports
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from utils.report_utils import get_api_auth_token
+from utils.report_utils import get_api_auth_token, get_http_session
 
 # Configure logging
 logging.basicConfig(
@@ -190,8 +190,6 @@ def test_api_connectivity(**kwargs):
     test_endpoint = f"{api_base_url}/health"
     
     try:
-        import requests
-        
         # Get token for authentication
         token = get_api_auth_token()
         
@@ -199,7 +197,7 @@ def test_api_connectivity(**kwargs):
             "Authorization": f"Bearer {token}"
         }
         
-        response = requests.get(test_endpoint, headers=headers)
+        response = get_http_session().get(test_endpoint, headers=headers)
         
         if response.status_code == 200:
             logger.info("API connectivity test successful")
@@ -1,13 +1,40 @@
 # utils/report_utils.py
+import copy
+import fcntl
+import gzip
+import hashlib
+import importlib.util
 import json
 import logging
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import time
+import numpy as np
+import pendulum
 import pandas as pd
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
 from airflow.models import Variable
+from airflow import settings
+from sqlalchemy import text
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image, Frame, Flowable
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.styles import getSampleStyleSheet
 import matplotlib.pyplot as plt
 import io
@@ -15,201 +42,2552 @@ from reportlab.lib.units import inch
 
 logger = logging.getLogger("report_utils")
 
-def get_api_auth_token():
+# Default number of search pages fetched in parallel after page 0
+DEFAULT_PAGE_CONCURRENCY = 4
+
+# Width of the time-of-day slots used by the order search date filter (288 per day)
+SEARCH_SLOT_MINUTES = 5
+
+# Per-page retry policy: attempts, backoff base/cap and longest honored Retry-After (seconds)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 60
+MAX_RETRY_AFTER = 300
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Timeout (seconds) for a single search page request
+DEFAULT_REQUEST_TIMEOUT = 120
+
+# Upper bound and per-request timeout (seconds) for adaptive page size probing
+MAX_PAGE_SIZE = 1000
+PAGE_SIZE_PROBE_TIMEOUT = 30
+
+# A larger probed page must not be more than this much slower per record than the best so far
+PAGE_SIZE_LATENCY_TOLERANCE = 1.25
+
+# Tokens are refreshed this long before they expire
+TOKEN_REFRESH_MARGIN = timedelta(minutes=2)
+
+# Process-local API token cache, so valid tokens are served without metadata DB queries
+_token_cache = {"token": None, "expiry": None}
+_token_lock = threading.Lock()
+
+# Metadata DB advisory lock serializing token refreshes across workers, and how long to wait for it (seconds)
+TOKEN_REFRESH_LOCK_KEY = 7215520001
+TOKEN_REFRESH_LOCK_TIMEOUT = 30
+
+# Connection pool size of the shared HTTP session; also caps page concurrency
+HTTP_POOL_SIZE = 16
+
+_http_session = None
+_http_session_pid = None
+_http_session_lock = threading.Lock()
+
+# Per-endpoint request rate limiters configured by the "api_rate_limits" Variable; host-wide
+# limiters keep their bucket state in this directory
+RATE_LIMIT_STATE_DIR = "/tmp/api_rate_limits"
+
+_rate_limiters = {}
+_rate_limiters_pid = None
+_rate_limiters_lock = threading.Lock()
+
+# Local cache of search results for closed windows; both can be overridden with Airflow Variables
+RESULT_CACHE_DIR = "/tmp/order_result_cache"
+RESULT_CACHE_MAX_BYTES = 1024 ** 3
+
+# SQLite file of the local order store (overridable with the "order_store_path" Variable),
+# and how far before the watermark incremental fetches restart to catch late-arriving orders
+ORDER_STORE_PATH = "/tmp/order_store.sqlite"
+DEFAULT_WATERMARK_OVERLAP_MINUTES = 60
+
+# Records per page read back from the order store
+STORE_PAGE_SIZE = 1000
+
+# Geometry of detail tables drawn by the canvas render engine (points)
+CANVAS_FONT_SIZE = 9
+CANVAS_ROW_HEIGHT = 16
+CANVAS_HEADER_HEIGHT = 20
+CANVAS_CELL_PADDING = 4
+
+# Default request budget and number of days fetched in parallel by backfills
+DEFAULT_BACKFILL_REQUESTS_PER_SECOND = 5
+DEFAULT_BACKFILL_CONCURRENCY = 4
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing "rate" requests per second, in bursts of up to "capacity"
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class FileTokenBucket:
+    """
+    Token bucket shared by every process on the host, with its state in a file guarded by flock
+    """
+    
+    def __init__(self, state_file, rate, capacity=None):
+        self.state_file = state_file
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available
+        """
+        while True:
+            with os.fdopen(os.open(self.state_file, os.O_RDWR | os.O_CREAT), 'r+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    state = json.loads(f.read() or "{}")
+                    now = time.time()
+                    tokens = state.get("tokens", self.capacity) + (now - state.get("updated", now)) * self.rate
+                    tokens = min(self.capacity, tokens)
+                    wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+                    if not wait:
+                        tokens -= 1
+                    
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps({"tokens": tokens, "updated": now}))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            
+            if not wait:
+                return
+            time.sleep(wait)
+
+def _create_rate_limiter(endpoint):
+    """
+    Build the rate limiter configured for an endpoint, or None if it is not limited
+    """
+    rate_limits = json.loads(Variable.get("api_rate_limits", "{}"))
+    for endpoint_suffix, rate_limit in rate_limits.items():
+        if not endpoint.endswith(endpoint_suffix):
+            continue
+        
+        rate = rate_limit["requests_per_second"]
+        capacity = rate_limit.get("burst")
+        if rate_limit.get("scope", "process") == "host":
+            state_file = os.path.join(
+                RATE_LIMIT_STATE_DIR,
+                f"{hashlib.sha256(endpoint.encode('utf-8')).hexdigest()[:16]}.json"
+            )
+            logger.info(f"Limiting {endpoint} to {rate} requests/s across all processes on this host")
+            return FileTokenBucket(state_file, rate, capacity)
+        
+        logger.info(f"Limiting {endpoint} to {rate} requests/s in this process")
+        return TokenBucket(rate, capacity)
+    
+    return None
+
+def get_rate_limiter(endpoint):
+    """
+    Get the rate limiter shared by all requests to an endpoint from this process
+    
+    Limits are configured in the "api_rate_limits" Variable, keyed by endpoint
+    suffix, e.g. {"/order/search": {"requests_per_second": 10, "burst": 20}}.
+    Limiters are process-wide by default; with "scope": "host" the bucket lives
+    in a file lock shared by all worker processes on the machine. Like the HTTP
+    session, the limiters are created again after a fork.
+    
+    Args:
+        endpoint (str): Endpoint URL
+        
+    Returns:
+        TokenBucket or FileTokenBucket: Limiter for the endpoint, or None if it is not limited
+    """
+    global _rate_limiters, _rate_limiters_pid
+    
+    with _rate_limiters_lock:
+        if _rate_limiters_pid != os.getpid():
+            _rate_limiters = {}
+            _rate_limiters_pid = os.getpid()
+        
+        if endpoint not in _rate_limiters:
+            _rate_limiters[endpoint] = _create_rate_limiter(endpoint)
+        return _rate_limiters[endpoint]
+
+def get_http_session():
+    """
+    Get the pooled, keep-alive HTTP session shared by all order API calls in this process.
+    
+    The session is created lazily and recreated after a fork, so each task process
+    reuses its own TCP/TLS connections across auth, search and health calls.
+    """
+    global _http_session, _http_session_pid
+    
+    with _http_session_lock:
+        if _http_session is None or _http_session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive"
+            })
+            
+            _http_session = session
+            _http_session_pid = os.getpid()
+            logger.info(f"Created pooled HTTP session (pool size {HTTP_POOL_SIZE})")
+    
+    return _http_session
+
+def _cache_api_token(token, expiry_time):
+    """
+    Remember the API token and its expiry in the process-local cache
+    """
+    _token_cache["token"] = token
+    _token_cache["expiry"] = expiry_time
+
+def _get_cached_api_token(rejected_token=None):
+    """
+    Get the process-cached token if it is valid for more than TOKEN_REFRESH_MARGIN
+    """
+    token = _token_cache["token"]
+    if token and token != rejected_token and datetime.now() < _token_cache["expiry"] - TOKEN_REFRESH_MARGIN:
+        return token
+    return None
+
+def _get_stored_api_token(rejected_token=None):
+    """
+    Get the shared token from Variables if it is valid for more than TOKEN_REFRESH_MARGIN
+    """
+    token = Variable.get("api_token", default_var=None)
+    token_expiry = Variable.get("api_token_expiry", default_var=None)
+    
+    if token and token_expiry and token != rejected_token:
+        # Check if token is still valid (not expired or about to expire)
+        expiry_time = datetime.fromisoformat(token_expiry)
+        if datetime.now() < expiry_time - TOKEN_REFRESH_MARGIN:
+            _cache_api_token(token, expiry_time)
+            return token
+    
+    return None
+
+@contextmanager
+def _token_refresh_lock():
+    """
+    Serialize token refreshes across workers with a Postgres advisory lock
+    
+    The session-level lock is taken on a dedicated metadata DB connection, not on the
+    scoped ORM session that Variable.get/set commit and close, so it is held until the
+    refresh is done. Other metadata backends, or failing to get the lock within
+    TOKEN_REFRESH_LOCK_TIMEOUT, fall back to refreshing without cross-worker locking.
+    """
+    if settings.engine is None or settings.engine.dialect.name != "postgresql":
+        yield
+        return
+    
+    connection = settings.engine.connect()
+    locked = False
+    try:
+        try:
+            deadline = time.monotonic() + TOKEN_REFRESH_LOCK_TIMEOUT
+            while True:
+                locked = connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": TOKEN_REFRESH_LOCK_KEY}
+                ).scalar()
+                if locked or time.monotonic() >= deadline:
+                    break
+                time.sleep(0.1)
+            if not locked:
+                logger.warning(
+                    f"Could not take the token refresh lock within {TOKEN_REFRESH_LOCK_TIMEOUT}s, "
+                    f"refreshing without it"
+                )
+        except Exception as e:
+            logger.warning(f"Could not take the token refresh lock, refreshing without it: {str(e)}")
+        
+        yield
+    finally:
+        if locked:
+            try:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": TOKEN_REFRESH_LOCK_KEY})
+            except Exception as e:
+                # Discard the connection so the lock is not left held in the pool
+                logger.warning(f"Could not release the token refresh lock: {str(e)}")
+                connection.invalidate()
+        connection.close()
+
+def get_api_auth_token(rejected_token=None):
+    """
+    Get or refresh the API authentication token.
+    
+    The token is served from a process-local cache while it is valid for more than
+    TOKEN_REFRESH_MARGIN; the Airflow Variables (metadata DB) are only read when the
+    process cache is cold or about to expire.
+    
+    Refreshes are single-flight: threads in a process wait on a local lock and workers
+    wait on a metadata DB advisory lock, then re-check the shared token, so only the
+    first caller posts to /auth/token and the rest reuse its result.
+    In a production environment, this should handle proper token acquisition and refresh.
+    
+    Args:
+        rejected_token (str, optional): Token the API just answered with 401; it is
+            treated as expired even if its recorded expiry lies in the future
+    """
+    # Serve from the process cache without touching the metadata DB
+    token = _get_cached_api_token(rejected_token)
+    if token:
+        return token
+    
+    with _token_lock:
+        # Another thread may have refreshed the token while we waited
+        token = _get_cached_api_token(rejected_token)
+        if token:
+            return token
+        
+        # Check if we have a valid token in Variables
+        token = _get_stored_api_token(rejected_token)
+        if token:
+            logger.info("Using existing API token")
+            return token
+        
+        with _token_refresh_lock():
+            # Another worker may have refreshed the token while we waited for the lock
+            token = _get_stored_api_token(rejected_token)
+            if token:
+                logger.info("Using API token refreshed by another worker")
+                return token
+            
+            return _request_api_token()
+
+def _request_api_token():
+    """
+    Acquire a new token from the auth endpoint and store it in Variables and the process cache
+    """
+    # If no token or expired, acquire a new one
+    try:
+        api_base_url = Variable.get("order_api_base_url")
+        auth_endpoint = f"{api_base_url}/auth/token"
+        
+        # Replace with your actual authentication mechanism
+        auth_payload = {
+            "client_id": Variable.get("api_client_id"),
+            "client_secret": Variable.get("api_client_secret"),
+            "grant_type": "client_credentials"
+        }
+        
+        response = get_http_session().post(auth_endpoint, json=auth_payload)
+        
+        if response.status_code == 200:
+            auth_data = response.json()
+            new_token = auth_data["access_token"]
+            
+            # Calculate expiry (typically provided in response, but we'll estimate if not)
+            expires_in = auth_data.get("expires_in", 3600)  # Default 1 hour
+            expiry_time = datetime.now() + timedelta(seconds=expires_in)
+            
+            # Store token and expiry in Variables
+            Variable.set("api_token", new_token)
+            Variable.set("api_token_expiry", expiry_time.isoformat())
+            _cache_api_token(new_token, expiry_time)
+            
+            logger.info("New API token acquired")
+            return new_token
+        else:
+            logger.error(f"Failed to acquire API token: {response.status_code} - {response.text}")
+            raise Exception("Authentication failed")
+    
+    except Exception as e:
+        logger.exception(f"Error during authentication: {str(e)}")
+        raise
+
+def _get_fetch_option(report_config, option, default):
+    """
+    Read a fetch tuning option from the report configuration's "fetch_options" section
+    """
+    if not report_config:
+        return default
+    return report_config.get("fetch_options", {}).get(option, default)
+
+def _build_search_payload(from_date, to_date, report_config=None):
+    """
+    Build the order search payload for a date range and optional report configuration
+    """
+    # Build default search payload
+    payload = {
+        "ViewName": "orderdetails",
+        "Filters": [
+            {
+                "ViewName": "orderdetails",
+                "AttributeId": "OrderDate",
+                "DataType": None,
+                "requiredFilter": False,
+                "FilterValues": [
+                    {
+                        "filter": {
+                            "date": {
+                                "from": from_date,
+                                "to": to_date
+                            },
+                            "time": {
+                                "from": "00:00",
+                                "to": "23:59",
+                                "start": 0,
+                                "end": 288
+                            },
+                            "quickSelect": "CUSTOM"
+                        }
+                    }
+                ],
+                "negativeFilter": False
+            }
+        ],
+        "RequestAttributeIds": [],
+        "SearchOptions": [],
+        "SearchChains": [],
+        "FilterExpression": None,
+        "Page": 0,
+        "TotalCount": -1,
+        "SortOrder": "desc",
+        "SortIndicator": "chevron-up",
+        "TimeZone": "America/Chicago",
+        "IsCommonUI": False,
+        "ComponentShortName": None,
+        "EnableMaxCountLimit": True,
+        "MaxCountLimit": _get_fetch_option(report_config, "max_count_limit", 1000),
+        "ComponentName": "com-manh-cp-xint",
+        "Size": _get_fetch_option(report_config, "page_size", 100),
+        "Sort": "OrderDate"
+    }
+    
+    # Customize payload based on report configuration
+    if report_config:
+        # Set request fields if specified
+        if "report_fields" in report_config:
+            payload["RequestAttributeIds"] = report_config["report_fields"]
+            
+        # Set view name if specified
+        view_name = report_config.get("query_parameters", {}).get("view_name")
+        if view_name:
+            payload["ViewName"] = view_name
+            payload["Filters"][0]["ViewName"] = view_name
+            
+        # Set sort field if specified
+        sort_field = report_config.get("query_parameters", {}).get("sort_field")
+        if sort_field:
+            payload["Sort"] = sort_field
+            
+        # Add order type filter if specified
+        order_type = report_config.get("query_parameters", {}).get("order_type")
+        if order_type:
+            payload["Filters"].append({
+                "ViewName": payload["ViewName"],
+                "AttributeId": "TextSearch",
+                "DataType": "text",
+                "requiredFilter": False,
+                "FilterValues": [
+                    f"\"{order_type}\""
+                ],
+                "negativeFilter": False
+            })
+    
+    return payload
+
+def _retry_delay(attempt, response, report_config=None):
+    """
+    Seconds to wait before retrying a failed page request
+    
+    A Retry-After header (seconds or HTTP date) on the response is honored;
+    otherwise exponential backoff with full jitter is used.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0), MAX_RETRY_AFTER)
+    
+    backoff = _get_fetch_option(report_config, "retry_backoff", DEFAULT_RETRY_BACKOFF)
+    max_backoff = _get_fetch_option(report_config, "max_retry_backoff", MAX_RETRY_BACKOFF)
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+def _fetch_search_page(search_endpoint, headers, payload, page, report_config=None, rate_limiter=None):
+    """
+    Fetch a single page of order search results
+    
+    Connection errors, timeouts and retryable status codes (429 and 5xx) are
+    retried for this page only, up to the "max_retries" fetch option, so a
+    flaky page does not restart the whole search. A 401 refreshes the API token
+    once and replays the page, so long searches survive token rollover.
+    
+    Args:
+        search_endpoint (str): Order search endpoint URL
+        headers (dict): Request headers; the current API token is added per request
+        payload (dict): Search payload; it is copied, not modified
+        page (int): Zero-based page number
+        report_config (dict, optional): Report configuration with fetch options
+        rate_limiter (TokenBucket, optional): Request budget every attempt draws from,
+            on top of the endpoint's global limit (see get_rate_limiter())
+        
+    Returns:
+        dict: Decoded API response for the page
+    """
+    max_retries = _get_fetch_option(report_config, "max_retries", DEFAULT_MAX_RETRIES)
+    request_timeout = _get_fetch_option(report_config, "request_timeout", DEFAULT_REQUEST_TIMEOUT)
+    
+    attempt = 0
+    token_refreshed = False
+    while True:
+        logger.info(f"Searching page {page}...")
+        
+        for limiter in (rate_limiter, get_rate_limiter(search_endpoint)):
+            if limiter:
+                limiter.acquire()
+        
+        token = get_api_auth_token()
+        response = None
+        try:
+            response = get_http_session().post(
+                search_endpoint, 
+                json=dict(payload, Page=page),
+                headers=dict(headers, Authorization=f"Bearer {token}"),
+                timeout=request_timeout
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= max_retries:
+                raise
+            logger.warning(f"Request for page {page} failed: {str(e)}")
+        else:
+            if response.status_code == 200:
+                return response.json()
+            
+            if response.status_code == 401 and not token_refreshed:
+                logger.warning(f"Page {page} was rejected with 401, refreshing the API token")
+                get_api_auth_token(rejected_token=token)
+                token_refreshed = True
+                continue
+            
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                logger.error(f"Error in API call: {response.status_code} - {response.text}")
+                raise Exception(f"API returned error: {response.status_code}")
+            
+            logger.warning(f"Page {page} returned {response.status_code}")
+        
+        delay = _retry_delay(attempt, response, report_config)
+        attempt += 1
+        logger.info(f"Retrying page {page} in {delay:.1f}s (attempt {attempt} of {max_retries})")
+        time.sleep(delay)
+
+def _negotiate_page_size(search_endpoint, payload, headers, report_config=None, rate_limiter=None):
+    """
+    Probe increasingly large page sizes and settle on the largest one the API tolerates
+    
+    Starting at the payload's current size, page 0 is requested with doubling sizes
+    up to the "max_page_size" fetch option. Probing stops at the first error or
+    timeout, when a page comes back short (the window is too small to learn more),
+    or when latency per record degrades noticeably versus the best size so far.
+    Each probe draws from the same rate limiters as the search pages.
+    
+    Args:
+        rate_limiter (TokenBucket, optional): Request budget every probe draws from,
+            on top of the endpoint's global limit (see get_rate_limiter())
+    
+    Returns:
+        int or None: Largest page size that returned a full page, or None if none did
+    """
+    max_page_size = min(
+        int(_get_fetch_option(report_config, "max_page_size", MAX_PAGE_SIZE)),
+        payload["MaxCountLimit"]
+    )
+    probe_timeout = _get_fetch_option(report_config, "page_size_probe_timeout", PAGE_SIZE_PROBE_TIMEOUT)
+    
+    best_size = None
+    best_seconds_per_record = None
+    size = payload["Size"]
+    
+    while size <= max_page_size:
+        for limiter in (rate_limiter, get_rate_limiter(search_endpoint)):
+            if limiter:
+                limiter.acquire()
+        
+        started = time.monotonic()
+        try:
+            response = get_http_session().post(
+                search_endpoint,
+                json=dict(payload, Page=0, Size=size),
+                headers=headers,
+                timeout=probe_timeout
+            )
+        except requests.exceptions.RequestException as e:
+            logger.info(f"Page size {size} failed during probing: {str(e)}")
+            break
+        elapsed = time.monotonic() - started
+        
+        if response.status_code != 200:
+            logger.info(f"Page size {size} rejected during probing: {response.status_code}")
+            break
+        
+        records = response.json().get("data") or []
+        if not records:
+            break
+        
+        seconds_per_record = elapsed / len(records)
+        logger.info(
+            f"Page size {size}: {len(records)} records in {elapsed:.2f}s, "
+            f"{len(response.content) / len(records):.0f} bytes/record, {seconds_per_record * 1000:.2f} ms/record"
+        )
+        
+        if best_seconds_per_record is not None and seconds_per_record > best_seconds_per_record * PAGE_SIZE_LATENCY_TOLERANCE:
+            logger.info(f"Page size {size} is slower per record than {best_size}, stopping")
+            break
+        
+        if len(records) < size:
+            break
+        
+        best_size = size
+        best_seconds_per_record = min(seconds_per_record, best_seconds_per_record or seconds_per_record)
+        size *= 2
+    
+    return best_size
+
+def _resolve_page_size(search_endpoint, payload, headers, report_config=None, rate_limiter=None):
+    """
+    Get the page size to use for a view, negotiating and persisting it if not yet learned
+    
+    Learned sizes are stored per view name in the "page_size_<view name>" Variable,
+    so later runs start at the good size without probing again (set the
+    "reprobe_page_size" fetch option to force a new negotiation).
+    """
+    variable_name = f"page_size_{payload['ViewName']}"
+    learned_size = Variable.get(variable_name, default_var=None)
+    
+    if learned_size and not _get_fetch_option(report_config, "reprobe_page_size", False):
+        logger.info(f"Using learned page size {learned_size} for view {payload['ViewName']}")
+        return int(learned_size)
+    
+    if learned_size:
+        payload = dict(payload, Size=int(learned_size))
+    
+    negotiated_size = _negotiate_page_size(search_endpoint, payload, headers, report_config, rate_limiter)
+    if not negotiated_size:
+        logger.info(f"Could not learn a page size for view {payload['ViewName']}, keeping {payload['Size']}")
+        return payload["Size"]
+    
+    Variable.set(variable_name, str(negotiated_size))
+    logger.info(f"Learned page size {negotiated_size} for view {payload['ViewName']}")
+    return negotiated_size
+
+def _search_window(from_date, to_date):
+    """
+    Convert a "DD MMM YYYY" date range into a [start, end) datetime window covering whole days
+    """
+    start = datetime.strptime(from_date, "%d %b %Y")
+    end = datetime.strptime(to_date, "%d %b %Y") + timedelta(days=1)
+    return start, end
+
+def _with_search_window(payload, start, end):
+    """
+    Return a copy of the search payload restricted to the [start, end) window
+    
+    The API filters by date plus a time-of-day range expressed in 5 minute slots
+    (0-288), so window boundaries must be aligned to SEARCH_SLOT_MINUTES.
+    """
+    # A window ending at midnight is expressed as slot 288 of the previous day
+    last_day = end - timedelta(days=1) if end.time() == datetime.min.time() else end
+    end_slot = (end - datetime.combine(last_day.date(), datetime.min.time())) // timedelta(minutes=SEARCH_SLOT_MINUTES)
+    start_slot = (start.hour * 60 + start.minute) // SEARCH_SLOT_MINUTES
+    
+    window_payload = copy.deepcopy(payload)
+    window_payload["Filters"][0]["FilterValues"][0]["filter"].update({
+        "date": {
+            "from": start.strftime("%d %b %Y"),
+            "to": last_day.strftime("%d %b %Y")
+        },
+        "time": {
+            "from": start.strftime("%H:%M"),
+            "to": (end - timedelta(minutes=1)).strftime("%H:%M"),
+            "start": start_slot,
+            "end": end_slot
+        }
+    })
+    return window_payload
+
+def _start_of_day(moment):
+    """
+    Midnight at the start of the day of "moment"
+    """
+    return datetime.combine(moment.date(), datetime.min.time())
+
+def _day_aligned_windows(start, end):
+    """
+    Cut a [start, end) window at its first and last midnight if it has partial days
+    
+    A date range with a time-of-day slot range can be read either as one
+    continuous span or as the same slots on every day; the readings only agree
+    for windows within a single day or made of whole days. A window starting or
+    ending mid-day and spanning several days is therefore split into a partial
+    first day, the whole days and a partial last day.
+    
+    Returns:
+        list: (window_start, window_end) tuples in chronological order
+    """
+    windows = []
+    
+    first_midnight = _start_of_day(start) + timedelta(days=1)
+    if start != _start_of_day(start) and first_midnight < end:
+        windows.append((start, first_midnight))
+        start = first_midnight
+    
+    last_window = None
+    if end != _start_of_day(end) and _start_of_day(end) > start:
+        last_window = (_start_of_day(end), end)
+        end = _start_of_day(end)
+    
+    if start < end:
+        windows.append((start, end))
+    if last_window:
+        windows.append(last_window)
+    return windows
+
+def _split_search_window(window_start, window_end):
+    """
+    Point at which to bisect a window, or None if it is a single search slot
+    
+    Windows spanning several days are split on the midnight nearest their middle,
+    so both halves stay day aligned; only windows within one day are bisected on
+    a slot boundary.
+    """
+    slot = timedelta(minutes=SEARCH_SLOT_MINUTES)
+    
+    if _start_of_day(window_start) + timedelta(days=1) < window_end:
+        middle = _start_of_day(window_start + (window_end - window_start) / 2)
+        if middle <= window_start:
+            middle += timedelta(days=1)
+        return middle
+    
+    if window_end - window_start > slot:
+        return window_start + ((window_end - window_start) // slot // 2) * slot
+    
+    return None
+
+def _build_window_payload(from_date, to_date, report_config=None, since=None):
+    """
+    Build the search payload and [start, end) window for a date range
+    
+    With "since", the window starts at that time (rounded down to a search slot)
+    instead of at midnight of "from_date".
+    """
+    payload = _build_search_payload(from_date, to_date, report_config)
+    start, end = _search_window(from_date, to_date)
+    
+    if since and since > start:
+        start = min(since.replace(minute=since.minute - since.minute % SEARCH_SLOT_MINUTES, second=0, microsecond=0), end)
+        payload = _with_search_window(payload, start, end)
+    
+    return payload, start, end
+
+def _plan_search_windows(fetch_page, payload, start, end, concurrency):
+    """
+    Split the [start, end) window until no sub-window hits the API's MaxCountLimit
+    
+    Windows are probed level by level with their page 0 fetched in parallel; any
+    window whose total count reaches the limit is split (see _split_search_window())
+    and probed again.
+    
+    Returns:
+        list: (window_start, window_end, page 0 response) tuples in chronological order
+    """
+    max_count_limit = payload["MaxCountLimit"]
+    planned = []
+    to_probe = _day_aligned_windows(start, end)
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while to_probe:
+            probes = to_probe
+            responses = executor.map(
+                lambda probe: fetch_page(_with_search_window(payload, *probe), 0),
+                probes
+            )
+            
+            to_probe = []
+            for (window_start, window_end), result_data in zip(probes, responses):
+                capped = result_data.get("totalCount", 0) >= max_count_limit
+                middle = _split_search_window(window_start, window_end) if capped else None
+                
+                if middle:
+                    logger.info(f"Window {window_start} - {window_end} hit MaxCountLimit={max_count_limit}, splitting at {middle}")
+                    to_probe.extend([(window_start, middle), (middle, window_end)])
+                    continue
+                
+                if capped:
+                    logger.warning(f"Window {window_start} - {window_end} still hits MaxCountLimit={max_count_limit}; results will be truncated")
+                planned.append((window_start, window_end, result_data))
+    
+    planned.sort(key=lambda window: window[0])
+    return planned
+
+def _iter_window_pages(fetch_page, payload, result_data, concurrency, resume_page=0):
+    """
+    Yield (page number, page response) for the pages of a single search window
+    
+    The remaining pages after page 0 are fetched concurrently and yielded in page
+    order, with at most "concurrency" pages in flight ahead of the consumer. Pages
+    before "resume_page" are skipped; page 0 is fetched here if "result_data" is None.
+    """
+    if result_data is None:
+        result_data = fetch_page(payload, 0)
+    
+    # Check if we have results
+    if not result_data.get("data"):
+        logger.info("No results found on page 0")
+        return
+    
+    if resume_page == 0:
+        logger.info(f"Retrieved {len(result_data['data'])} records from page 0")
+        yield 0, result_data
+    
+    # Work out how many pages remain from the reported total
+    page_size = payload["Size"]
+    total_count = result_data.get("totalCount", 0)
+    if payload.get("EnableMaxCountLimit"):
+        total_count = min(total_count, payload["MaxCountLimit"])
+    page_count = math.ceil(total_count / page_size)
+    
+    if len(result_data["data"]) < page_size or page_count <= max(1, resume_page):
+        return
+    
+    remaining_pages = iter(range(max(1, resume_page), page_count))
+    logger.info(f"Fetching pages {max(1, resume_page)}-{page_count - 1} with concurrency {concurrency}")
+    
+    with ThreadPoolExecutor(max_workers=min(concurrency, page_count - 1)) as executor:
+        pending = deque()
+        
+        def submit_next(count):
+            for page in islice(remaining_pages, count):
+                pending.append((page, executor.submit(fetch_page, payload, page)))
+        
+        submit_next(concurrency)
+        
+        try:
+            while pending:
+                page, future = pending.popleft()
+                page_data = future.result()
+                
+                if not page_data.get("data"):
+                    logger.info(f"No more results found after page {page}")
+                    break
+                
+                # Keep the window full while the consumer handles this page
+                submit_next(1)
+                
+                logger.info(f"Retrieved {len(page_data['data'])} records from page {page}")
+                yield page, page_data
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+def _payload_hash(payload):
+    """
+    Stable hash of a search payload, ignoring the page number
+    """
+    canonical = json.dumps(dict(payload, Page=None), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _load_fetch_checkpoint(checkpoint_dir, payload_hash):
+    """
+    Load the fetch checkpoint in "checkpoint_dir" if it was written for the same payload
+    
+    A checkpoint for a different payload is discarded. The partial results file is
+    truncated to the size recorded with the last completed page, dropping any page
+    that was only partly written when the previous attempt died.
+    """
+    checkpoint_file = os.path.join(checkpoint_dir, "checkpoint.json")
+    if not os.path.exists(checkpoint_file):
+        return None
+    
+    with open(checkpoint_file, 'r') as f:
+        checkpoint = json.load(f)
+    
+    if checkpoint.get("payload_hash") != payload_hash:
+        logger.info(f"Discarding fetch checkpoint in {checkpoint_dir}: search payload changed")
+        clear_fetch_checkpoint(checkpoint_dir)
+        return None
+    
+    with open(os.path.join(checkpoint_dir, "pages.ndjson"), 'ab') as f:
+        f.truncate(checkpoint["results_bytes"])
+    
+    return checkpoint
+
+def _save_fetch_checkpoint(checkpoint_dir, checkpoint):
+    """
+    Atomically write the fetch checkpoint state
+    """
+    checkpoint_file = os.path.join(checkpoint_dir, "checkpoint.json")
+    with open(checkpoint_file + ".tmp", 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(checkpoint_file + ".tmp", checkpoint_file)
+
+def _record_checkpoint_page(checkpoint_dir, checkpoint, window_index, page, page_data):
+    """
+    Append a completed page to the partial results file and advance the checkpoint
+    """
+    entry = {"window": window_index, "page": page, "data": page_data["data"]}
+    if page == 0:
+        entry["totalCount"] = page_data.get("totalCount", 0)
+    
+    with open(os.path.join(checkpoint_dir, "pages.ndjson"), 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        checkpoint["results_bytes"] = f.tell()
+    
+    checkpoint["windows"][window_index]["last_completed_page"] = page
+    _save_fetch_checkpoint(checkpoint_dir, checkpoint)
+
+def clear_fetch_checkpoint(checkpoint_dir):
+    """
+    Remove a fetch checkpoint once its results have been safely persisted
+    """
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+def _api_now(payload):
+    """
+    Current wall-clock time in the search payload's time zone, as a naive datetime
+    """
+    return datetime.now(pendulum.timezone(payload["TimeZone"])).replace(tzinfo=None)
+
+def _result_cache_key(payload, report_config=None):
+    """
+    Hash of the normalized search payload, ignoring settings that only change paging
+    """
+    normalized = dict(
+        payload,
+        Size=None,
+        RequestAttributeIds=sorted(payload.get("RequestAttributeIds") or []),
+        SplitWindows=bool(_get_fetch_option(report_config, "split_windows", True))
+    )
+    return _payload_hash(normalized)
+
+def _result_cache_file(from_date, to_date, report_config=None, since=None):
+    """
+    Path of the cached results for a search, or None if the search should not be cached
+    
+    Only closed windows are cached: the window must have ended in the API's time
+    zone, so a cached search can never miss orders placed after it ran.
+    """
+    if not _get_fetch_option(report_config, "result_cache_ttl", 0):
+        return None
+    
+    payload, _, window_end = _build_window_payload(from_date, to_date, report_config, since)
+    if window_end > _api_now(payload):
+        return None
+    
+    cache_dir = Variable.get("result_cache_dir", RESULT_CACHE_DIR)
+    return os.path.join(cache_dir, f"{_result_cache_key(payload, report_config)}.ndjson")
+
+def _read_result_cache(cache_file, ttl):
+    """
+    Return an iterator over the pages cached in "cache_file", or None if there is no fresh entry
+    
+    The file modification time records when the entry was written (for the TTL);
+    the access time is bumped on every hit and drives LRU eviction.
+    """
+    try:
+        stat = os.stat(cache_file)
+    except FileNotFoundError:
+        return None
+    
+    if time.time() - stat.st_mtime > ttl:
+        logger.info(f"Result cache entry {cache_file} expired")
+        return None
+    
+    os.utime(cache_file, (time.time(), stat.st_mtime))
+    return _iter_cached_pages(cache_file)
+
+def _iter_cached_pages(cache_file):
+    """
+    Stream the pages of a result cache entry
+    """
+    with open(cache_file, 'r') as f:
+        for line in f:
+            yield json.loads(line)
+
+def _write_result_cache(cache_file, pages):
+    """
+    Pass pages through while writing them to the result cache
+    
+    The entry is only published, atomically, once every page has been consumed;
+    an interrupted fetch leaves nothing behind.
+    """
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    
+    try:
+        with open(temp_file, 'w') as f:
+            for page_records in pages:
+                f.write(json.dumps(page_records) + "\n")
+                yield page_records
+        os.replace(temp_file, cache_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    
+    _evict_result_cache(os.path.dirname(cache_file))
+
+def _evict_result_cache(cache_dir):
+    """
+    Remove least recently used cache entries until the cache fits its size budget
+    """
+    max_bytes = int(Variable.get("result_cache_max_bytes", RESULT_CACHE_MAX_BYTES))
+    
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".ndjson"):
+            stat = entry.stat()
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+    
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_bytes -= size
+            logger.info(f"Evicted result cache entry {path}")
+        except FileNotFoundError:
+            pass
+
+def iter_order_pages(from_date, to_date, report_config=None, checkpoint_dir=None, since=None, rate_limiter=None):
+    """
+    Iterate over order search results one page at a time
+    
+    If the report sets the "result_cache_ttl" fetch option (seconds), searches
+    over windows that have already closed are cached on disk, keyed by a hash of
+    the normalized search payload, and repeated runs within the TTL are served
+    from the cache without calling the API.
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        checkpoint_dir (str, optional): Directory for resumable fetch checkpoints
+        since (datetime, optional): Only search orders from this time onwards
+        rate_limiter (TokenBucket, optional): Request budget shared with other searches
+        
+    Yields:
+        list: Order records of one page
+    """
+    pages = _fetch_order_pages(from_date, to_date, report_config, checkpoint_dir, since, rate_limiter)
+    
+    cache_file = _result_cache_file(from_date, to_date, report_config, since)
+    if cache_file is None:
+        yield from pages
+        return
+    
+    cached_pages = _read_result_cache(cache_file, _get_fetch_option(report_config, "result_cache_ttl", 0))
+    if cached_pages is not None:
+        logger.info(f"Serving search from {from_date} to {to_date} from result cache {cache_file}")
+        yield from cached_pages
+        return
+    
+    yield from _write_result_cache(cache_file, pages)
+
+def _fetch_order_pages(from_date, to_date, report_config=None, checkpoint_dir=None, since=None, rate_limiter=None):
+    """
+    Fetch order search results from the API one page at a time
+    
+    Page 0 is fetched first to learn the total record count; the remaining pages
+    are then fetched concurrently (bounded by the report's "page_concurrency"
+    fetch option) and yielded in page order, so memory stays flat however many
+    orders the window contains.
+    
+    When the window reaches the API's MaxCountLimit it is recursively bisected
+    into smaller time windows (disable with the "split_windows" fetch option),
+    which are merged newest-first for descending sorts and de-duplicated by OrderId.
+    
+    If "checkpoint_dir" is given, every completed page is recorded there together
+    with a hash of the search payload. A retry with the same payload replays the
+    recorded pages from disk and only fetches the missing ones; call
+    clear_fetch_checkpoint() once the results have been persisted.
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        checkpoint_dir (str, optional): Directory for resumable fetch checkpoints
+        since (datetime, optional): Only search orders from this time onwards
+        rate_limiter (TokenBucket, optional): Request budget shared with other searches
+        
+    Yields:
+        list: Order records of one page
+    """
+    payload, start, end = _build_window_payload(from_date, to_date, report_config, since)
+    if start >= end:
+        logger.info(f"Nothing to search from {start} to {end}")
+        return
+    
+    # Get API configuration
+    api_base_url = Variable.get("order_api_base_url")
+    search_endpoint = f"{api_base_url}/order/search"
+    
+    # Get token for authentication
+    token = get_api_auth_token()
+    
+    concurrency = max(1, int(_get_fetch_option(report_config, "page_concurrency", DEFAULT_PAGE_CONCURRENCY)))
+    concurrency = min(concurrency, HTTP_POOL_SIZE)
+    
+    # Set headers with authentication
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {token}"
+    }
+    
+    try:
+        if _get_fetch_option(report_config, "adaptive_page_size", False):
+            payload["Size"] = _resolve_page_size(search_endpoint, payload, headers, report_config, rate_limiter)
+        
+        fetch_page = partial(_fetch_search_page, search_endpoint, headers, report_config=report_config, rate_limiter=rate_limiter)
+        
+        checkpoint = None
+        if checkpoint_dir:
+            checkpoint = _load_fetch_checkpoint(checkpoint_dir, _payload_hash(payload))
+            os.makedirs(checkpoint_dir, exist_ok=True)
+        
+        if checkpoint:
+            # Reuse the recorded window plan instead of probing again
+            logger.info(f"Resuming search from checkpoint in {checkpoint_dir}")
+            windows = [
+                (
+                    window["start"] and datetime.fromisoformat(window["start"]),
+                    window["end"] and datetime.fromisoformat(window["end"]),
+                    None
+                )
+                for window in checkpoint["windows"]
+            ]
+        elif payload.get("EnableMaxCountLimit") and _get_fetch_option(report_config, "split_windows", True):
+            windows = _plan_search_windows(fetch_page, payload, start, end, concurrency)
+            if len(windows) > 1:
+                logger.info(f"Fetching {len(windows)} sub-windows to stay under MaxCountLimit")
+                if payload.get("SortOrder") == "desc":
+                    windows.reverse()
+        elif len(_day_aligned_windows(start, end)) > 1:
+            # A "since" window starting mid-day is searched day aligned, one part at a time
+            windows = [(window_start, window_end, None) for window_start, window_end in _day_aligned_windows(start, end)]
+            if payload.get("SortOrder") == "desc":
+                windows.reverse()
+        else:
+            windows = [(None, None, fetch_page(payload, 0))]
+        
+        if checkpoint_dir and not checkpoint:
+            checkpoint = {
+                "payload_hash": _payload_hash(payload),
+                "windows": [
+                    {
+                        "start": window_start and window_start.isoformat(),
+                        "end": window_end and window_end.isoformat(),
+                        "last_completed_page": -1
+                    }
+                    for window_start, window_end, _ in windows
+                ],
+                "results_bytes": 0
+            }
+            _save_fetch_checkpoint(checkpoint_dir, checkpoint)
+        
+        # Recorded pages are stored in the order they were yielded
+        recorded_pages = None
+        if checkpoint and checkpoint["results_bytes"]:
+            recorded_pages = open(os.path.join(checkpoint_dir, "pages.ndjson"), 'r')
+        
+        seen_order_ids = set()
+        try:
+            for window_index, (window_start, window_end, result_data) in enumerate(windows):
+                window_payload = payload if window_start is None else _with_search_window(payload, window_start, window_end)
+                window_pages = []
+                resume_page = 0
+                
+                if checkpoint:
+                    last_completed_page = checkpoint["windows"][window_index]["last_completed_page"]
+                    if last_completed_page >= 0:
+                        logger.info(f"Replaying {last_completed_page + 1} checkpointed pages of window {window_index}")
+                        recorded = [json.loads(recorded_pages.readline()) for _ in range(last_completed_page + 1)]
+                        window_pages = [(entry["page"], entry) for entry in recorded]
+                        result_data = recorded[0]
+                        resume_page = last_completed_page + 1
+                
+                fetched_pages = _iter_window_pages(fetch_page, window_payload, result_data, concurrency, resume_page)
+                for page, page_data in chain(window_pages, fetched_pages):
+                    if checkpoint and page >= resume_page:
+                        _record_checkpoint_page(checkpoint_dir, checkpoint, window_index, page, page_data)
+                    
+                    if len(windows) == 1:
+                        yield page_data["data"]
+                        continue
+                    
+                    unique_records = []
+                    for record in page_data["data"]:
+                        order_id = record.get("OrderId")
+                        if order_id is not None:
+                            if order_id in seen_order_ids:
+                                continue
+                            seen_order_ids.add(order_id)
+                        unique_records.append(record)
+                    
+                    if unique_records:
+                        yield unique_records
+        finally:
+            if recorded_pages:
+                recorded_pages.close()
+    
+    except Exception as e:
+        logger.error(f"Error during API search: {str(e)}")
+        raise
+
+def iter_orders(from_date, to_date, report_config=None, checkpoint_dir=None, since=None):
+    """
+    Iterate over order search results one record at a time
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        checkpoint_dir (str, optional): Directory for resumable fetch checkpoints
+        since (datetime, optional): Only search orders from this time onwards
+        
+    Yields:
+        dict: Order record
+    """
+    for page_records in iter_order_pages(from_date, to_date, report_config, checkpoint_dir, since):
+        yield from page_records
+
+def query_order_api(from_date, to_date, report_config=None):
+    """
+    Query the order search API with configurable parameters
+    
+    Prefer iter_order_pages/iter_orders for large windows; this collects every
+    record in memory.
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        
+    Returns:
+        list: Order data results
+    """
+    all_results = list(iter_orders(from_date, to_date, report_config))
+    
+    logger.info(f"Total records retrieved: {len(all_results)}")
+    return all_results
+
+def report_date_range(execution_date, report_config=None):
+    """
+    Date range a report covers for an execution date
+    
+    The "window" section of a report configuration selects the range:
+    {"type": "rolling", "days": N} covers the N days before the execution date
+    through the execution date (the default, with N = 1), while {"type": "week"}
+    and {"type": "month"} cover the calendar week (Monday to Sunday) or month
+    containing the execution date.
+    
+    Args:
+        execution_date (datetime): Execution date of the run
+        report_config (dict, optional): Report configuration with a "window" section
+        
+    Returns:
+        tuple: (from_date, to_date) in format "DD MMM YYYY"
+    """
+    window = (report_config or {}).get("window") or {}
+    window_type = window.get("type", "rolling")
+    
+    if window_type == "rolling":
+        from_day = execution_date - timedelta(days=int(window.get("days", 1)))
+        to_day = execution_date
+    elif window_type == "week":
+        from_day = execution_date - timedelta(days=execution_date.weekday())
+        to_day = from_day + timedelta(days=6)
+    elif window_type == "month":
+        from_day = execution_date.replace(day=1)
+        to_day = (from_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        raise Exception(f"Unknown report window type: {window_type}")
+    
+    return from_day.strftime("%d %b %Y"), to_day.strftime("%d %b %Y")
+
+def _shared_fetch_key(report_config):
+    """
+    Canonical description of the search a report needs, minus anything applied locally
+    
+    A report's order type is normally sent to the API as a TextSearch filter and is
+    part of the key; if the report declares "order_type_field", the type is filtered
+    locally on that field instead, so reports differing only in order type share a key.
+    """
+    query_parameters = report_config.get("query_parameters", {})
+    local_type_filter = bool(query_parameters.get("order_type") and query_parameters.get("order_type_field"))
+    
+    return {
+        "view_name": query_parameters.get("view_name") or "orderdetails",
+        "sort_field": query_parameters.get("sort_field") or "OrderDate",
+        "order_type": None if local_type_filter else query_parameters.get("order_type")
+    }
+
+def query_plan_key(report_config):
+    """
+    Short stable hash identifying the search a report needs (see build_query_plan)
+    """
+    key = _shared_fetch_key(report_config)
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def build_query_plan(report_configs):
+    """
+    Group reports that can be served by one superset fetch
+    
+    Reports are keyed by view, sort and API-side filters (see _shared_fetch_key);
+    each distinct key becomes one fetch requesting the union of the reports' fields.
+    
+    Args:
+        report_configs (dict): Report configurations by report id
+        
+    Returns:
+        dict: Plan entries by fetch key hash, each with "report_ids" and the superset
+            "config" to pass to iter_order_pages()
+    """
+    plan = {}
+    for report_id, report_config in report_configs.items():
+        key = _shared_fetch_key(report_config)
+        key_hash = query_plan_key(report_config)
+        
+        if key_hash not in plan:
+            query_parameters = {
+                "view_name": key["view_name"],
+                "sort_field": key["sort_field"]
+            }
+            if key["order_type"]:
+                query_parameters["order_type"] = key["order_type"]
+            
+            plan[key_hash] = {
+                "report_ids": [],
+                "config": {
+                    "report_id": f"shared_{key_hash}",
+                    "query_parameters": query_parameters,
+                    "report_fields": [],
+                    "fetch_options": report_config.get("fetch_options", {})
+                }
+            }
+        
+        entry = plan[key_hash]
+        entry["report_ids"].append(report_id)
+        
+        # Request the union of fields; a report without a field list needs every field
+        columns = report_columns(report_config)
+        shared_config = entry["config"]
+        if columns is None or "report_fields" not in shared_config:
+            shared_config.pop("report_fields", None)
+            continue
+        
+        order_type_field = report_config.get("query_parameters", {}).get("order_type_field")
+        for field in columns + ([order_type_field] if order_type_field else []):
+            if field not in shared_config["report_fields"]:
+                shared_config["report_fields"].append(field)
+    
+    return plan
+
+def select_report_records(records, report_config):
+    """
+    Narrow records from a shared superset fetch down to what one report asked for
+    
+    Applies the report's order type locally when it declares "order_type_field" and
+    keeps only the report's columns.
+    
+    Yields:
+        dict: Order record
+    """
+    query_parameters = report_config.get("query_parameters", {})
+    order_type = query_parameters.get("order_type")
+    order_type_field = query_parameters.get("order_type_field")
+    columns = report_columns(report_config)
+    
+    for record in records:
+        if order_type and order_type_field and record.get(order_type_field) != order_type:
+            continue
+        if columns:
+            record = {name: record[name] for name in columns if name in record}
+        yield record
+
+def _parse_order_time(value):
+    """
+    Parse an order timestamp from the API into a naive datetime, or None if it is not a timestamp
+    """
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value).to_pydatetime().replace(tzinfo=None)
+    except (ValueError, TypeError):
+        return None
+
+def store_query_key(report_config=None):
+    """
+    Hash identifying the search behind a report's stored orders, independent of the date window
+    """
+    payload = _build_search_payload(None, None, report_config)
+    payload["Filters"][0]["FilterValues"] = []
+    return _result_cache_key(payload, report_config)[:16]
+
+def open_order_store():
+    """
+    Open the local order store, creating its tables on first use
+    
+    Orders are kept per search ("query_key", see store_query_key()) and upserted by
+    OrderId, with the order day as partition column. The coverage table records
+    the days a search has fully fetched after they closed, which therefore need
+    no further API calls.
+    
+    Returns:
+        sqlite3.Connection: Connection to the store
+    """
+    connection = sqlite3.connect(Variable.get("order_store_path", ORDER_STORE_PATH), timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS orders (
+            query_key TEXT NOT NULL,
+            order_id TEXT NOT NULL,
+            order_day TEXT NOT NULL,
+            order_time TEXT,
+            record TEXT NOT NULL,
+            PRIMARY KEY (query_key, order_id)
+        );
+        CREATE INDEX IF NOT EXISTS orders_by_day ON orders (query_key, order_day, order_time);
+        CREATE TABLE IF NOT EXISTS coverage (
+            query_key TEXT NOT NULL,
+            order_day TEXT NOT NULL,
+            fetched_at TEXT NOT NULL,
+            PRIMARY KEY (query_key, order_day)
+        );
+    """)
+    return connection
+
+def _store_rows(query_key, records, default_day):
+    """
+    Convert order records into rows of the store's orders table
+    """
+    for record in records:
+        order_time = _parse_order_time(record.get("OrderDate"))
+        record_json = json.dumps(record)
+        yield (
+            query_key,
+            str(record.get("OrderId") or hashlib.sha256(record_json.encode("utf-8")).hexdigest()),
+            (order_time.date() if order_time else default_day).isoformat(),
+            order_time and order_time.isoformat(),
+            record_json
+        )
+
+def store_order_pages(query_key, pages, covered_from, covered_to):
+    """
+    Pass pages through while upserting them into the local order store
+    
+    Each page is committed as it arrives. Once every page has been consumed, the
+    whole days within [covered_from, covered_to) are recorded as covered.
+    
+    Args:
+        query_key (str): Store key of the search, see store_query_key()
+        pages (iterable): Pages of order records
+        covered_from (datetime): Start of the time range the pages fully cover
+        covered_to (datetime): End of that range; must not be later than the
+            time the fetch started, so that only closed days are covered
+        
+    Yields:
+        list: Order records of one page
+    """
+    connection = open_order_store()
+    try:
+        for page_records in pages:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO orders (query_key, order_id, order_day, order_time, record) VALUES (?, ?, ?, ?, ?)",
+                    _store_rows(query_key, page_records, covered_from.date())
+                )
+            yield page_records
+        
+        first_day = covered_from.date() if covered_from.time() == datetime.min.time() else covered_from.date() + timedelta(days=1)
+        covered_days = [
+            first_day + timedelta(days=offset)
+            for offset in range(max(0, (covered_to.date() - first_day).days))
+        ]
+        fetched_at = datetime.now().isoformat()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO coverage (query_key, order_day, fetched_at) VALUES (?, ?, ?)",
+                [(query_key, day.isoformat(), fetched_at) for day in covered_days]
+            )
+    finally:
+        connection.close()
+
+def store_search_pages(from_date, to_date, report_config=None, checkpoint_dir=None, rate_limiter=None):
+    """
+    Fetch order search results, upserting every page into the local order store
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        checkpoint_dir (str, optional): Directory for resumable fetch checkpoints
+        rate_limiter (TokenBucket, optional): Request budget shared with other searches
+        
+    Yields:
+        list: Order records of one page
+    """
+    window_start, window_end = _search_window(from_date, to_date)
+    fetch_started = _api_now(_build_search_payload(from_date, to_date, report_config))
+    
+    yield from store_order_pages(
+        store_query_key(report_config),
+        iter_order_pages(from_date, to_date, report_config, checkpoint_dir, rate_limiter=rate_limiter),
+        window_start,
+        min(window_end, fetch_started)
+    )
+
+def update_order_store(report_id, from_date, to_date, report_config=None):
+    """
+    Incrementally fetch a report's orders into the local order store
+    
+    The latest OrderDate stored for the report is kept as a watermark in the
+    "report_watermark_<report id>" Variable; only orders from the watermark
+    onwards (less a "watermark_overlap_minutes" fetch option, for orders that
+    reach the API late) are requested and upserted into the store. The Variable
+    also records since when the report's fetches have been contiguous, so days
+    spread over several incremental runs are still marked as covered.
+    
+    Args:
+        report_id (str): Report identifier owning the watermark
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        
+    Returns:
+        str: Store key of the report's search, for iter_store_pages()
+    """
+    query_key = store_query_key(report_config)
+    watermark_variable = f"report_watermark_{report_id}"
+    window_start, window_end = _search_window(from_date, to_date)
+    
+    # A watermark recorded for a different search, or whose contiguous fetches
+    # start after this window, does not describe what the store holds
+    watermark = None
+    since = None
+    fetched_from = window_start
+    stored_watermark = json.loads(Variable.get(watermark_variable, "{}"))
+    if stored_watermark.get("query_key") == query_key and "fetched_from" in stored_watermark:
+        stored_fetched_from = datetime.fromisoformat(stored_watermark["fetched_from"])
+        if stored_fetched_from <= window_start:
+            watermark = datetime.fromisoformat(stored_watermark["watermark"])
+            overlap = _get_fetch_option(report_config, "watermark_overlap_minutes", DEFAULT_WATERMARK_OVERLAP_MINUTES)
+            since = watermark - timedelta(minutes=overlap)
+            if since > window_start:
+                fetched_from = stored_fetched_from
+            logger.info(f"[{report_id}] Fetching orders since {since} (watermark {watermark})")
+    
+    fetch_started = _api_now(_build_search_payload(from_date, to_date, report_config))
+    pages = store_order_pages(
+        query_key,
+        iter_order_pages(from_date, to_date, report_config, since=since),
+        fetched_from,
+        min(window_end, fetch_started)
+    )
+    
+    record_count = 0
+    for page_records in pages:
+        for record in page_records:
+            order_time = _parse_order_time(record.get("OrderDate"))
+            if order_time and (watermark is None or order_time > watermark):
+                watermark = order_time
+        record_count += len(page_records)
+    
+    if watermark:
+        Variable.set(watermark_variable, json.dumps({
+            "query_key": query_key,
+            "watermark": watermark.isoformat(),
+            "fetched_from": fetched_from.isoformat()
+        }))
+    
+    logger.info(f"[{report_id}] Upserted {record_count} fetched orders into store {query_key}")
+    return query_key
+
+def _date_range_days(from_date, to_date):
+    """
+    Days of a "DD MMM YYYY" date range, inclusive
+    """
+    start, end = _search_window(from_date, to_date)
+    return [start.date() + timedelta(days=offset) for offset in range((end - start).days)]
+
+def _missing_store_days(query_key, days):
+    """
+    The days the local order store does not cover yet for a search
+    """
+    connection = open_order_store()
+    try:
+        covered_days = {
+            order_day for order_day, in connection.execute(
+                "SELECT order_day FROM coverage WHERE query_key = ? AND order_day >= ? AND order_day <= ?",
+                (query_key, days[0].isoformat(), days[-1].isoformat())
+            )
+        } if days else set()
+    finally:
+        connection.close()
+    
+    return [day for day in days if day.isoformat() not in covered_days]
+
+def fill_order_store(from_date, to_date, report_config=None):
+    """
+    Make sure the local order store holds every day of a date range
+    
+    Days the store already covers for the report's search are skipped; the
+    missing days are fetched from the API in contiguous ranges, so a long
+    report window only costs a search for the days not fetched before.
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        
+    Returns:
+        str: Store key of the report's search, for iter_store_pages()
+    """
+    query_key = store_query_key(report_config)
+    days = _date_range_days(from_date, to_date)
+    missing_days = _missing_store_days(query_key, days)
+    
+    # Group the missing days into contiguous ranges, one search each
+    missing_ranges = []
+    for day in missing_days:
+        if missing_ranges and missing_ranges[-1][1] + timedelta(days=1) == day:
+            missing_ranges[-1][1] = day
+        else:
+            missing_ranges.append([day, day])
+    
+    logger.info(
+        f"Store {query_key} covers {len(days) - len(missing_days)} of {len(days)} days from {from_date} to {to_date}, "
+        f"fetching {len(missing_ranges)} missing ranges"
+    )
+    for first_day, last_day in missing_ranges:
+        for _ in store_search_pages(first_day.strftime("%d %b %Y"), last_day.strftime("%d %b %Y"), report_config):
+            pass
+    
+    return query_key
+
+def _backfill_day(day, report_config, rate_limiter):
+    """
+    Fetch one day into the local order store, returning the number of orders stored
+    """
+    day_date = day.strftime("%d %b %Y")
+    return sum(
+        len(page_records)
+        for page_records in store_search_pages(day_date, day_date, report_config, rate_limiter=rate_limiter)
+    )
+
+def backfill_order_store(from_date, to_date, report_config=None,
+                         max_requests_per_second=DEFAULT_BACKFILL_REQUESTS_PER_SECOND,
+                         concurrency=DEFAULT_BACKFILL_CONCURRENCY):
+    """
+    Load a historical date range into the local order store
+    
+    The range is split into days, which are fetched concurrently while all
+    their search requests share one token bucket of "max_requests_per_second".
+    Days the store already covers are skipped and each finished day is recorded
+    in the coverage table, so an interrupted backfill resumes where it stopped
+    when run again. Progress is logged as each day completes.
+    
+    Args:
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        max_requests_per_second (float, optional): Request budget of the whole backfill
+        concurrency (int, optional): Number of days fetched in parallel
+        
+    Returns:
+        dict: Counts of "days", "skipped_days", "fetched_days" and "orders"
+    """
+    query_key = store_query_key(report_config)
+    days = _date_range_days(from_date, to_date)
+    missing_days = _missing_store_days(query_key, days)
+    logger.info(
+        f"Backfilling {len(missing_days)} of {len(days)} days from {from_date} to {to_date} into store {query_key} "
+        f"({len(days) - len(missing_days)} already covered)"
+    )
+    
+    rate_limiter = TokenBucket(max_requests_per_second)
+    started = time.monotonic()
+    order_count = 0
+    failed_days = []
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        futures = {executor.submit(_backfill_day, day, report_config, rate_limiter): day for day in missing_days}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            day = futures[future]
+            try:
+                day_orders = future.result()
+            except Exception as e:
+                logger.error(f"Backfill of {day.isoformat()} failed: {str(e)}")
+                failed_days.append(day.isoformat())
+                continue
+            
+            order_count += day_orders
+            elapsed = time.monotonic() - started
+            remaining = elapsed / completed * (len(missing_days) - completed)
+            logger.info(
+                f"Backfilled {day.isoformat()} ({day_orders} orders): {completed} of {len(missing_days)} days done, "
+                f"{order_count} orders, about {remaining:.0f}s remaining"
+            )
+    
+    if failed_days:
+        raise Exception(f"Backfill failed for {len(failed_days)} days, run it again to retry them: {sorted(failed_days)}")
+    
+    return {
+        "days": len(days),
+        "skipped_days": len(days) - len(missing_days),
+        "fetched_days": len(missing_days),
+        "orders": order_count
+    }
+
+def iter_store_pages(query_key, from_date, to_date, report_config=None):
+    """
+    Iterate over the stored orders of a date range
+    
+    Orders follow the report's sort order on OrderDate.
+    
+    Args:
+        query_key (str): Store key of the search, see store_query_key()
+        from_date (str): Start date in format "DD MMM YYYY"
+        to_date (str): End date in format "DD MMM YYYY"
+        report_config (dict, optional): Report configuration with query parameters
+        
+    Yields:
+        list: Order records of one page of up to STORE_PAGE_SIZE records
+    """
+    start, end = _search_window(from_date, to_date)
+    direction = "DESC" if _build_search_payload(from_date, to_date, report_config)["SortOrder"] == "desc" else "ASC"
+    
+    connection = open_order_store()
+    try:
+        cursor = connection.execute(
+            f"SELECT record FROM orders WHERE query_key = ? AND order_day >= ? AND order_day < ? "
+            f"ORDER BY order_day {direction}, order_time {direction}",
+            (query_key, start.date().isoformat(), end.date().isoformat())
+        )
+        while True:
+            rows = cursor.fetchmany(STORE_PAGE_SIZE)
+            if not rows:
+                break
+            yield [json.loads(record) for record, in rows]
+    finally:
+        connection.close()
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed for the columnar handoff formats
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception("The parquet and arrow handoff formats require pyarrow (pip install pyarrow)")
+    return pyarrow
+
+def report_columns(report_config):
+    """
+    Columns a report needs for rendering: its report fields plus any summary fields
+    
+    Returns:
+        list or None: Column names, or None if the report does not restrict its fields
+    """
+    if not report_config or "report_fields" not in report_config:
+        return None
+    
+    columns = list(report_config["report_fields"])
+    for summary_field in report_config.get("summary_fields", []):
+        if summary_field["field"] not in columns:
+            columns.append(summary_field["field"])
+    return columns
+
+def _infer_arrow_table(pa, records):
+    """
+    Build an Arrow table from a page of records, with a column for every field of any record
+    
+    Table.from_pylist() only takes the fields of the first record, which would
+    drop fields that the first order of a page happens to omit.
+    """
+    names = list(dict.fromkeys(name for record in records for name in record))
+    return pa.Table.from_pydict({name: [record.get(name) for record in records] for name in names})
+
+def _records_to_arrow(pa, page_table, schema):
+    """
+    Cast a page of records, as inferred by _infer_arrow_table(), to the file schema
+    
+    The cast is safe, so drift such as text in a numeric column fails loudly
+    instead of corrupting values.
+    """
+    try:
+        arrays = [
+            page_table[field.name].cast(field.type) if field.name in page_table.column_names else pa.nulls(page_table.num_rows, field.type)
+            for field in schema
+        ]
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        raise Exception(f"Result page does not match the inferred schema, declare the column in column_types: {str(e)}")
+    
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def _widen_columnar_schema(pa, schema, page_table, column_types):
+    """
+    Widen inferred integer columns to float64 where a later page has fractional values
+    
+    Returns:
+        pyarrow.Schema: Widened schema, or None if the page fits the schema as it is
+    """
+    fields = list(schema)
+    widened = False
+    for index, field in enumerate(fields):
+        if field.name in column_types or field.name not in page_table.column_names:
+            continue
+        if pa.types.is_integer(field.type) and pa.types.is_floating(page_table.schema.field(field.name).type):
+            fields[index] = pa.field(field.name, pa.float64())
+            widened = True
+    
+    return pa.schema(fields, metadata=schema.metadata) if widened else None
+
+def _open_columnar_writer(pa, result_file, schema, handoff_format):
+    """
+    Open a Parquet (zstd) or uncompressed Arrow IPC file writer
+    """
+    if handoff_format == "parquet":
+        return pa.parquet.ParquetWriter(result_file, schema, compression="zstd")
+    # Left uncompressed so the PDF task can memory-map it zero-copy
+    return pa.ipc.new_file(result_file, schema)
+
+def _rewrite_columnar_results(pa, result_file, schema, handoff_format):
+    """
+    Rewrite the pages written so far with a widened schema, returning the new open writer
+    """
+    previous_file = result_file + ".widen"
+    os.replace(result_file, previous_file)
+    try:
+        if handoff_format == "parquet":
+            written = pa.parquet.read_table(previous_file)
+        else:
+            with pa.memory_map(previous_file) as source:
+                written = pa.ipc.open_file(source).read_all()
+        
+        writer = _open_columnar_writer(pa, result_file, schema, handoff_format)
+        writer.write_table(written.cast(schema))
+        return writer
+    finally:
+        os.remove(previous_file)
+
+def write_columnar_results(result_file, pages, metadata, handoff_format="parquet", columns=None, column_types=None):
+    """
+    Write order search results to a columnar file, page by page
+    
+    Parquet files are zstd-compressed; Arrow IPC files are left uncompressed so
+    open_arrow_results() can memory-map them without decoding.
+    
+    Columns listed in "column_types" get the declared Arrow type (e.g. "float64");
+    the others are inferred from the first page, with all-null columns typed as
+    strings. An inferred integer column that turns fractional on a later page is
+    widened to float64, rewriting the pages already written. The metadata is
+    stored as JSON in the schema metadata under "report_metadata".
+    
+    Args:
+        result_file (str): Output path
+        pages (iterable): Pages of order records, e.g. from iter_order_pages()
+        metadata (dict): Report metadata (report id, configuration, execution date)
+        handoff_format (str): "parquet" or "arrow" (Arrow IPC file)
+        columns (list, optional): Columns to keep
+        column_types (dict, optional): Arrow type names by column
+        
+    Returns:
+        int: Number of records written
+    """
+    pa = _import_pyarrow()
+    column_types = column_types or {}
+    schema_metadata = {b"report_metadata": json.dumps(metadata).encode("utf-8")}
+    
+    writer = None
+    schema = None
+    record_count = 0
+    
+    try:
+        for records in pages:
+            page_table = _infer_arrow_table(pa, records)
+            if schema is None:
+                names = columns or page_table.column_names
+                fields = []
+                for name in names:
+                    if name in column_types:
+                        fields.append(pa.field(name, pa.type_for_alias(column_types[name])))
+                    elif name not in page_table.column_names or pa.types.is_null(page_table.schema.field(name).type):
+                        fields.append(pa.field(name, pa.string()))
+                    else:
+                        fields.append(page_table.schema.field(name))
+                schema = pa.schema(fields, metadata=schema_metadata)
+                writer = _open_columnar_writer(pa, result_file, schema, handoff_format)
+            else:
+                widened_schema = _widen_columnar_schema(pa, schema, page_table, column_types)
+                if widened_schema is not None:
+                    logger.info(f"Widening integer columns to float64 in {result_file} after {record_count} records")
+                    writer.close()
+                    writer = None
+                    schema = widened_schema
+                    writer = _rewrite_columnar_results(pa, result_file, schema, handoff_format)
+            
+            table = _records_to_arrow(pa, page_table, schema)
+            writer.write_table(table)
+            record_count += table.num_rows
+        
+        if writer is None:
+            # No results: write an empty file that still carries the columns and metadata
+            schema = pa.schema(
+                [pa.field(name, pa.type_for_alias(column_types.get(name, "string"))) for name in columns or []],
+                metadata=schema_metadata
+            )
+            writer = _open_columnar_writer(pa, result_file, schema, handoff_format)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return record_count
+
+def read_columnar_metadata(result_file):
+    """
+    Read the report metadata stored in a columnar result file without loading any data
+    """
+    pa = _import_pyarrow()
+    if result_file.endswith(".parquet"):
+        schema = pa.parquet.read_schema(result_file)
+    else:
+        with pa.memory_map(result_file) as source:
+            schema = pa.ipc.open_file(source).schema
+    return json.loads(schema.metadata[b"report_metadata"])
+
+def _read_columnar_table(result_file, columns=None):
+    """
+    Load a columnar result file into a pyarrow Table, reading only the requested columns
+    """
+    pa = _import_pyarrow()
+    if result_file.endswith(".parquet"):
+        available = pa.parquet.read_schema(result_file).names
+        selected = [name for name in columns if name in available] if columns else None
+        return pa.parquet.read_table(result_file, columns=selected)
+    
+    with pa.memory_map(result_file) as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns:
+        table = table.select([name for name in columns if name in table.column_names])
+    return table
+
+def read_columnar_results(result_file, columns=None):
+    """
+    Load a columnar result file into a DataFrame, reading only the requested columns
+    
+    Args:
+        result_file (str): Path written by write_columnar_results()
+        columns (list, optional): Columns to load; names missing from the file are ignored
+        
+    Returns:
+        pandas.DataFrame: Results
+    """
+    return _read_columnar_table(result_file, columns).to_pandas()
+
+def read_columnar_records(result_file, columns=None):
+    """
+    Load a columnar result file as a list of record dicts shaped like the JSON results
+    
+    Values keep their Python types (integer columns with gaps stay int rather than
+    becoming float), and null fields are dropped from each record, as if the API had
+    omitted them, so code written against the JSON records can apply its own defaults.
+    
+    Args:
+        result_file (str): Path written by write_columnar_results()
+        columns (list, optional): Columns to load; names missing from the file are ignored
+        
+    Returns:
+        list: Result records
+    """
+    return [
+        {field: value for field, value in record.items() if value is not None}
+        for record in _read_columnar_table(result_file, columns).to_pylist()
+    ]
+
+def _open_spool(spool_file, mode):
+    """
+    Open an NDJSON spool in text mode, compressed according to its extension (.gz or .zst)
+    """
+    if spool_file.endswith(".gz"):
+        return gzip.open(spool_file, mode + "t", encoding="utf-8")
+    
+    if spool_file.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise Exception("zstd-compressed spools require zstandard (pip install zstandard)")
+        return zstandard.open(spool_file, mode + "t", encoding="utf-8")
+    
+    return open(spool_file, mode, encoding="utf-8")
+
+def write_ndjson_spool(spool_file, pages, metadata=None):
+    """
+    Append order search results to a newline-delimited JSON spool as pages arrive
+    
+    Each page is flushed as soon as it is written, so partial results can be
+    inspected (and read back) while a long search is still running. Files ending in
+    ".gz" or ".zst" are gzip- or zstd-compressed. Metadata, if given, is written to
+    a "<spool_file>.meta.json" sidecar.
+    
+    Args:
+        spool_file (str): Output path
+        pages (iterable): Pages of order records, e.g. from iter_order_pages()
+        metadata (dict, optional): Report metadata (report id, configuration, execution date)
+        
+    Returns:
+        int: Number of records written
+    """
+    if metadata is not None:
+        with open(spool_file + ".meta.json", 'w') as f:
+            json.dump(metadata, f)
+    
+    record_count = 0
+    with _open_spool(spool_file, 'w') as f:
+        for records in pages:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            record_count += len(records)
+    
+    return record_count
+
+def read_ndjson_metadata(spool_file):
+    """
+    Read the metadata sidecar written alongside an NDJSON spool
+    """
+    with open(spool_file + ".meta.json", 'r') as f:
+        return json.load(f)
+
+def iter_ndjson_spool(spool_file, columns=None):
+    """
+    Stream records from an NDJSON spool, optionally keeping only the given columns
+    
+    Yields:
+        dict: Order record
+    """
+    with _open_spool(spool_file, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if columns:
+                record = {name: record[name] for name in columns if name in record}
+            yield record
+
+def read_ndjson_spool(spool_file, columns=None, chunk_size=10000):
+    """
+    Load an NDJSON spool into a DataFrame, chunk by chunk
+    
+    Only "columns" are kept from each record, so the full records never have to be
+    held in memory at once.
+    
+    Returns:
+        pandas.DataFrame: Results
+    """
+    records = iter_ndjson_spool(spool_file, columns)
+    frames = []
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        frames.append(pd.DataFrame(chunk))
+    
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(frames, ignore_index=True)
+
+def open_arrow_results(result_file, columns=None):
+    """
+    Open an Arrow IPC result file memory-mapped, without copying or parsing the data
+    
+    The returned table references the mapped file's buffers directly, so opening it
+    costs the same regardless of file size; pages are loaded by the OS as columns
+    are touched.
+    
+    Args:
+        result_file (str): Arrow IPC file written by write_columnar_results()
+        columns (list, optional): Columns to keep; names missing from the file are ignored
+        
+    Returns:
+        pyarrow.Table: Memory-mapped results
+    """
+    pa = _import_pyarrow()
+    with pa.memory_map(result_file) as source:
+        table = pa.ipc.open_file(source).read_all()
+    
+    if columns:
+        table = table.select([name for name in columns if name in table.column_names])
+    return table
+
+def _is_arrow_table(data):
+    """
+    Check whether data is a pyarrow Table without requiring pyarrow to be installed
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return isinstance(data, pyarrow.Table)
+
+def _is_tabular(data):
     """
-    Get or refresh the API authentication token.
-    In a production environment, this should handle proper token acquisition and refresh.
+    Check whether data is a DataFrame or an Arrow table rather than a list of records
     """
-    # Check if we have a valid token in Variables
-    token = Variable.get("api_token", default_var=None)
-    token_expiry = Variable.get("api_token_expiry", default_var=None)
+    return isinstance(data, pd.DataFrame) or _is_arrow_table(data)
+
+def _column_names(data):
+    """
+    Column names of a DataFrame or Arrow table
+    """
+    return list(data.column_names) if _is_arrow_table(data) else list(data.columns)
+
+def _column_stat(data, field, operation):
+    """
+    Compute a "sum", "mean", "min" or "max" over a column of a DataFrame or Arrow table
     
-    if token and token_expiry:
-        # Check if token is still valid (not expired)
-        expiry_time = datetime.fromisoformat(token_expiry)
-        if datetime.now() < expiry_time:
-            logger.info("Using existing API token")
-            return token
+    Arrow tables are aggregated with pyarrow.compute directly on the column buffers.
+    """
+    if not _is_arrow_table(data):
+        return getattr(data[field], operation)()
     
-    # If no token or expired, acquire a new one
-    try:
-        api_base_url = Variable.get("order_api_base_url")
-        auth_endpoint = f"{api_base_url}/auth/token"
-        
-        # Replace with your actual authentication mechanism
-        auth_payload = {
-            "client_id": Variable.get("api_client_id"),
-            "client_secret": Variable.get("api_client_secret"),
-            "grant_type": "client_credentials"
-        }
-        
-        response = requests.post(auth_endpoint, json=auth_payload)
-        
-        if response.status_code == 200:
-            auth_data = response.json()
-            new_token = auth_data["access_token"]
-            
-            # Calculate expiry (typically provided in response, but we'll estimate if not)
-            expires_in = auth_data.get("expires_in", 3600)  # Default 1 hour
-            expiry_time = datetime.now() + timedelta(seconds=expires_in)
-            
-            # Store token and expiry in Variables
-            Variable.set("api_token", new_token)
-            Variable.set("api_token_expiry", expiry_time.isoformat())
-            
-            logger.info("New API token acquired")
-            return new_token
-        else:
-            logger.error(f"Failed to acquire API token: {response.status_code} - {response.text}")
-            raise Exception("Authentication failed")
+    import pyarrow.compute as pc
+    return getattr(pc, operation)(data[field]).as_py()
+
+def _value_counts(data, field, limit):
+    """
+    Most frequent non-null values of a column of a DataFrame or Arrow table, as a Series
+    """
+    if not _is_arrow_table(data):
+        return data[field].value_counts().head(limit)
     
-    except Exception as e:
-        logger.exception(f"Error during authentication: {str(e)}")
-        raise
+    import pyarrow.compute as pc
+    counts = pc.value_counts(data[field].drop_null())
+    series = pd.Series(counts.field("counts").to_numpy(), index=counts.field("values").to_pylist(), name="count")
+    return series.sort_values(ascending=False, kind="stable").head(limit)
 
-def query_order_api(from_date, to_date, report_config=None):
+def _iter_frames(data, fields):
     """
-    Query the order search API with configurable parameters
+    Yield the given fields of a DataFrame or Arrow table as DataFrames
+    
+    Arrow tables are converted one record batch at a time so only a batch of rows
+    is materialized as Python objects at once.
+    """
+    if not _is_arrow_table(data):
+        yield data
+        return
+    
+    for batch in data.select(fields).to_batches():
+        yield batch.to_pandas()
+
+def _format_cell(value):
+    """
+    Format a single table cell: integers with thousands separators, floats with two decimals
+    """
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.2f}"
+    return str(value)
+
+def _format_column(column):
+    """
+    Format a DataFrame column into table cell strings in one pass, choosing the format by dtype
+    """
+    if pd.api.types.is_bool_dtype(column):
+        return column.astype(str).tolist()
+    if pd.api.types.is_integer_dtype(column):
+        return column.map("{:,}".format).tolist()
+    if pd.api.types.is_float_dtype(column):
+        return column.map("{:,.2f}".format).tolist()
+    if pd.api.types.is_string_dtype(column) and not pd.api.types.is_object_dtype(column):
+        # Missing values render as "None", as they do in object columns
+        return column.astype(object).fillna("None").astype(str).tolist()
+    
+    # Object columns can mix types, so they are formatted value by value
+    return column.map(_format_cell).tolist()
+
+def format_table_rows(frame, fields):
+    """
+    Format the given fields of a DataFrame as table rows of strings
+    
+    Each column is formatted in a single pass over its values, instead of walking
+    the frame row by row.
     
     Args:
-        from_date (str): Start date in format "DD MMM YYYY"
-        to_date (str): End date in format "DD MMM YYYY"
-        report_config (dict, optional): Report configuration with query parameters
+        frame (pandas.DataFrame): Data to format
+        fields (list): Columns to include, in order
         
     Returns:
-        list: Order data results
+        list: Rows as lists of formatted cell strings
+    """
+    columns = [_format_column(frame[field]) for field in fields]
+    return [list(row) for row in zip(*columns)]
+
+class _SpaceLeft(Flowable):
+    """
+    Zero-height flowable recording the height left in the frame it is laid out in
     """
-    # Get API configuration
-    api_base_url = Variable.get("order_api_base_url")
-    search_endpoint = f"{api_base_url}/order/search"
     
-    # Get token for authentication
-    token = get_api_auth_token()
+    def __init__(self):
+        Flowable.__init__(self)
+        self.height_left = None
     
-    # Build default search payload
-    payload = {
-        "ViewName": "orderdetails",
-        "Filters": [
-            {
-                "ViewName": "orderdetails",
-                "AttributeId": "OrderDate",
-                "DataType": None,
-                "requiredFilter": False,
-                "FilterValues": [
-                    {
-                        "filter": {
-                            "date": {
-                                "from": from_date,
-                                "to": to_date
-                            },
-                            "time": {
-                                "from": "00:00",
-                                "to": "23:59",
-                                "start": 0,
-                                "end": 288
-                            },
-                            "quickSelect": "CUSTOM"
-                        }
-                    }
-                ],
-                "negativeFilter": False
-            }
-        ],
-        "RequestAttributeIds": [],
-        "SearchOptions": [],
-        "SearchChains": [],
-        "FilterExpression": None,
-        "Page": 0,
-        "TotalCount": -1,
-        "SortOrder": "desc",
-        "SortIndicator": "chevron-up",
-        "TimeZone": "America/Chicago",
-        "IsCommonUI": False,
-        "ComponentShortName": None,
-        "EnableMaxCountLimit": True,
-        "MaxCountLimit": 1000,
-        "ComponentName": "com-manh-cp-xint",
-        "Size": 100,
-        "Sort": "OrderDate"
-    }
+    def wrap(self, available_width, available_height):
+        self.height_left = available_height
+        return 0, 0
     
-    # Customize payload based on report configuration
-    if report_config:
-        # Set request fields if specified
-        if "report_fields" in report_config:
-            payload["RequestAttributeIds"] = report_config["report_fields"]
-            
-        # Set view name if specified
-        view_name = report_config.get("query_parameters", {}).get("view_name")
-        if view_name:
-            payload["ViewName"] = view_name
-            payload["Filters"][0]["ViewName"] = view_name
-            
-        # Set sort field if specified
-        sort_field = report_config.get("query_parameters", {}).get("sort_field")
-        if sort_field:
-            payload["Sort"] = sort_field
-            
-        # Add order type filter if specified
-        order_type = report_config.get("query_parameters", {}).get("order_type")
-        if order_type:
-            payload["Filters"].append({
-                "ViewName": payload["ViewName"],
-                "AttributeId": "TextSearch",
-                "DataType": "text",
-                "requiredFilter": False,
-                "FilterValues": [
-                    f"\"{order_type}\""
-                ],
-                "negativeFilter": False
-            })
+    def draw(self):
+        pass
+
+def _space_left_after(doc, elements):
+    """
+    Height left on the last page after laying out the given elements in the document's frame
+    """
+    marker = _SpaceLeft()
+    SimpleDocTemplate(
+        io.BytesIO(), pagesize=doc.pagesize,
+        leftMargin=doc.leftMargin, rightMargin=doc.rightMargin,
+        topMargin=doc.topMargin, bottomMargin=doc.bottomMargin
+    ).build(list(elements) + [marker])
+    return marker.height_left
+
+def _detail_chunk_sizes(doc, elements, heading, table_fields, table_rows, col_widths, table_style):
+    """
+    Number of detail table rows that fit on the first detail page and on each following page
     
-    # Set headers with authentication
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
+    Row heights are measured by laying out the header and first data row with
+    the table style. The first chunk goes on the page the summary elements end
+    on, sized to the space they leave after the section heading; if not even
+    one row fits there, the detail section starts on a new page.
+    
+    Returns:
+        tuple: (first chunk rows, rows per following chunk, whether to start on a new page)
+    """
+    header_table = Table([table_fields], colWidths=col_widths)
+    header_table.setStyle(TableStyle(table_style))
+    header_height = header_table.wrap(doc.width, doc.height)[1]
+    
+    sample_table = Table([table_fields] + table_rows[:1], colWidths=col_widths)
+    sample_table.setStyle(TableStyle(table_style))
+    row_height = max(1, sample_table.wrap(doc.width, doc.height)[1] - header_height)
+    
+    # The document frame has 6pt padding at the top and bottom
+    page_height = doc.height - 12 - header_height
+    heading_height = heading.wrap(doc.width, doc.height)[1] + heading.getSpaceAfter()
+    chunk_rows = max(1, int(page_height // row_height))
+    
+    # Keep a point to spare so rounding never pushes the last row onto another page
+    space_left = _space_left_after(doc, elements) - 1
+    first_chunk_rows = int((space_left - heading.getSpaceBefore() - heading_height - header_height) // row_height)
+    if first_chunk_rows >= 1:
+        return first_chunk_rows, chunk_rows, False
+    
+    return max(1, int((page_height - heading_height) // row_height)), chunk_rows, True
+
+def _detail_tables(table_fields, table_rows, chunk_bounds, col_widths, table_style, row_offset=0):
+    """
+    Build one detail table per chunk of rows, each repeating the header
+    
+    "row_offset" is the position of table_rows[0] in the whole detail section,
+    which keeps the zebra stripes continuous when a section is built in shards.
+    """
+    tables = []
+    for chunk_start, chunk_end in chunk_bounds:
+        table = Table([table_fields] + table_rows[chunk_start:chunk_end], colWidths=col_widths, repeatRows=1)
+        
+        # Add a zebra striping pattern as a single style rule, starting the
+        # cycle on the right color so the stripes continue across chunks
+        band_colors = [colors.white, colors.lightgrey]
+        if (row_offset + chunk_start) % 2:
+            band_colors.reverse()
+        
+        table.setStyle(TableStyle(table_style + [('ROWBACKGROUNDS', (0, 1), (-1, -1), band_colors)]))
+        tables.append(table)
+    return tables
+
+def _draw_page_number_text(canvas, page_number, pagesize):
+    """
+    Draw "Page N" in the bottom right margin of a page
+    """
+    canvas.saveState()
+    canvas.setFont('Helvetica', 9)
+    canvas.drawRightString(pagesize[0] - inch, inch / 2, f"Page {page_number}")
+    canvas.restoreState()
+
+def _draw_page_number(canvas, doc):
+    """
+    Page callback numbering the pages of a document as it is built
+    """
+    _draw_page_number_text(canvas, doc.page, doc.pagesize)
+
+def _render_detail_shard(shard_file, pagesize, table_fields, table_rows, chunk_bounds, row_offset,
+                         col_widths, table_style, first_page):
+    """
+    Render a shard of the detail section into its own numbered PDF, in a worker process
+    
+    Returns the number of pages rendered.
+    """
+    elements = _detail_tables(table_fields, table_rows, chunk_bounds, col_widths, table_style, row_offset)
+    
+    def draw_page_number(canvas, doc):
+        _draw_page_number_text(canvas, first_page - 1 + doc.page, doc.pagesize)
+    
+    shard_doc = SimpleDocTemplate(shard_file, pagesize=pagesize)
+    shard_doc.build(elements, onFirstPage=draw_page_number, onLaterPages=draw_page_number)
+    return shard_doc.page
+
+def _render_detail_shards(executor, part_files, pagesize, table_fields, table_rows, shards,
+                          col_widths, table_style, first_pages):
+    """
+    Render every detail shard in the process pool, returning their page counts
+    """
+    futures = []
+    for index, shard in enumerate(shards):
+        row_start, row_end = shard[0][0], shard[-1][1]
+        futures.append(executor.submit(
+            _render_detail_shard, part_files[index], pagesize, table_fields,
+            table_rows[row_start:row_end],
+            [(chunk_start - row_start, chunk_end - row_start) for chunk_start, chunk_end in shard],
+            row_start, col_widths, table_style, first_pages[index]
+        ))
+    return [future.result() for future in futures]
+
+def _build_pdf_parallel(doc, elements, table_fields, table_rows, chunk_bounds, col_widths, table_style, render_workers):
+    """
+    Build a report PDF with the detail section rendered in shards by a process pool
+    
+    The summary section is built first, in this process, together with the
+    section heading and first detail chunk, to learn where the following detail
+    pages start. The workers then render contiguous runs of the remaining
+    chunks, numbering their pages on the assumption that every chunk fills one
+    page; if a shard turns out longer, the shards are rendered again with the
+    exact page numbers. The parts are concatenated with pypdf.
     
-    all_results = []
-    page = 0
+    Returns:
+        bool: True if the PDF was built, False if the worker processes could not be
+            started and the caller should build it serially instead
+    """
+    from pypdf import PdfWriter
     
+    pdf_file = doc.filename
+    shard_size = math.ceil(len(chunk_bounds) / min(render_workers, len(chunk_bounds)))
+    shards = [chunk_bounds[index:index + shard_size] for index in range(0, len(chunk_bounds), shard_size)]
+    summary_file = f"{pdf_file}.summary"
+    part_files = [f"{pdf_file}.part{index}" for index in range(len(shards))]
+    
+    logger.info(f"Rendering {len(chunk_bounds)} detail tables in {len(shards)} processes")
     try:
-        while True:
-            payload["Page"] = page
-            logger.info(f"Searching page {page}...")
-            
-            response = requests.post(
-                search_endpoint, 
-                json=payload,
-                headers=headers
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Error in API call: {response.status_code} - {response.text}")
-                raise Exception(f"API returned error: {response.status_code}")
-            
-            result_data = response.json()
-            
-            # Check if we have results
-            if not result_data.get("data") or len(result_data["data"]) == 0:
-                logger.info(f"No more results found after page {page}")
-                break
-            
-            all_results.extend(result_data["data"])
-            logger.info(f"Retrieved {len(result_data['data'])} records from page {page}")
-            
-            # Check if we've reached the end
-            if len(all_results) >= result_data.get("totalCount", 0) or len(result_data["data"]) < payload["Size"]:
+        doc.filename = summary_file
+        doc.build(list(elements), onFirstPage=_draw_page_number, onLaterPages=_draw_page_number)
+        doc.filename = pdf_file
+        
+        try:
+            with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                first_pages = [doc.page + 1 + index * shard_size for index in range(len(shards))]
+                page_counts = _render_detail_shards(
+                    executor, part_files, doc.pagesize, table_fields, table_rows, shards, col_widths, table_style, first_pages
+                )
+                
+                actual_first_pages = [doc.page + 1 + sum(page_counts[:index]) for index in range(len(shards))]
+                if actual_first_pages != first_pages:
+                    logger.info("Detail tables do not fill exactly one page each, renumbering the detail pages")
+                    _render_detail_shards(
+                        executor, part_files, doc.pagesize, table_fields, table_rows, shards, col_widths, table_style,
+                        actual_first_pages
+                    )
+        except (AssertionError, OSError, BrokenProcessPool) as e:
+            # Worker processes cannot be started, e.g. from a daemonic task process
+            logger.warning(f"Could not start PDF render worker processes, rendering serially: {str(e)}")
+            return False
+        
+        writer = PdfWriter()
+        for part_file in [summary_file] + part_files:
+            writer.append(part_file)
+        with open(pdf_file, 'wb') as f:
+            writer.write(f)
+        return True
+    finally:
+        for part_file in [summary_file] + part_files:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+
+def _truncate_cells(cells, width, font_name, font_size):
+    """
+    Truncate cell strings with "..." so that they fit a column width
+    
+    Strings short enough to fit even in the widest glyphs are kept without
+    measuring; others are measured once per distinct value from cached glyph widths.
+    """
+    always_fits = int(width // (font_size * 1.02))
+    glyph_widths = {}
+    truncated_values = {}
+    
+    def glyph_width(char):
+        if char not in glyph_widths:
+            glyph_widths[char] = stringWidth(char, font_name, font_size)
+        return glyph_widths[char]
+    
+    def truncate(value):
+        if sum(glyph_width(char) for char in value) <= width:
+            return value
+        
+        available = width - stringWidth("...", font_name, font_size)
+        used = 0
+        for length, char in enumerate(value):
+            used += glyph_width(char)
+            if used > available:
+                return value[:length] + "..."
+        return value
+    
+    result = []
+    for cell in cells:
+        if len(cell) > always_fits:
+            if cell not in truncated_values:
+                truncated_values[cell] = truncate(cell)
+            cell = truncated_values[cell]
+        result.append(cell)
+    return result
+
+def _draw_canvas_table_page(canvas, x, top, table_fields, page_columns, col_widths, row_offset):
+    """
+    Draw one page of the detail table: header, zebra stripes, grid and one text object per column
+    """
+    row_count = len(page_columns[0]) if page_columns else 0
+    table_width = sum(col_widths)
+    header_bottom = top - CANVAS_HEADER_HEIGHT
+    bottom = header_bottom - row_count * CANVAS_ROW_HEIGHT
+    
+    canvas.saveState()
+    
+    canvas.setFillColor(colors.blue)
+    canvas.rect(x, header_bottom, table_width, CANVAS_HEADER_HEIGHT, stroke=0, fill=1)
+    
+    # Stripe the even rows of the whole detail section
+    canvas.setFillColor(colors.lightgrey)
+    for index in range(row_count):
+        if (row_offset + index + 1) % 2 == 0:
+            canvas.rect(x, header_bottom - (index + 1) * CANVAS_ROW_HEIGHT, table_width, CANVAS_ROW_HEIGHT, stroke=0, fill=1)
+    
+    column_edges = [x]
+    for col_width in col_widths:
+        column_edges.append(column_edges[-1] + col_width)
+    row_edges = [top, header_bottom] + [header_bottom - (index + 1) * CANVAS_ROW_HEIGHT for index in range(row_count)]
+    canvas.setStrokeColor(colors.black)
+    canvas.grid(column_edges, row_edges)
+    
+    text_padding = (CANVAS_ROW_HEIGHT - CANVAS_FONT_SIZE) / 2 + 2
+    canvas.setFillColor(colors.whitesmoke)
+    canvas.setFont('Helvetica-Bold', CANVAS_FONT_SIZE)
+    for edge, field in zip(column_edges, table_fields):
+        canvas.drawString(edge + CANVAS_CELL_PADDING, header_bottom + text_padding, field)
+    
+    canvas.setFillColor(colors.black)
+    for edge, cells in zip(column_edges, page_columns):
+        text = canvas.beginText(edge + CANVAS_CELL_PADDING, header_bottom - CANVAS_ROW_HEIGHT + text_padding)
+        text.setFont('Helvetica', CANVAS_FONT_SIZE, leading=CANVAS_ROW_HEIGHT)
+        for cell in cells:
+            text.textLine(cell)
+        canvas.drawText(text)
+    
+    canvas.restoreState()
+    return bottom
+
+def _build_pdf_canvas(doc, elements, table_fields, table_rows, col_widths):
+    """
+    Build a report PDF drawing the detail table directly on the canvas
+    
+    The summary section is laid out with Platypus frames on the same canvas;
+    the detail rows, which all have the same height, are then drawn page by
+    page with precomputed column positions, cells truncated to their column.
+    """
+    canvas = pdf_canvas.Canvas(doc.filename, pagesize=doc.pagesize)
+    page_number = 1
+    
+    # Summary section, one frame per page, splitting flowables that overflow a frame
+    while elements:
+        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height)
+        added = 0
+        while elements:
+            if frame.add(elements[0], canvas, trySplit=1):
+                del elements[0]
+                added += 1
+                continue
+            parts = frame.split(elements[0], canvas)
+            if not parts:
                 break
-            
-            page += 1
+            elements[0:1] = parts
+        if not added:
+            raise Exception(f"Summary element does not fit on a page: {elements[0]!r}")
+        _draw_page_number_text(canvas, page_number, doc.pagesize)
+        canvas.showPage()
+        page_number += 1
     
-    except Exception as e:
-        logger.error(f"Error during API search: {str(e)}")
-        raise
+    # Truncate each column once, up front
+    columns = [
+        _truncate_cells([row[index] for row in table_rows], col_width - 2 * CANVAS_CELL_PADDING, 'Helvetica', CANVAS_FONT_SIZE)
+        for index, col_width in enumerate(col_widths)
+    ]
+    table_fields = [
+        _truncate_cells([field], col_width - 2 * CANVAS_CELL_PADDING, 'Helvetica-Bold', CANVAS_FONT_SIZE)[0]
+        for field, col_width in zip(table_fields, col_widths)
+    ]
     
-    logger.info(f"Total records retrieved: {len(all_results)}")
-    return all_results
+    top = doc.bottomMargin + doc.height
+    heading_height = 24
+    first_page_rows = max(1, int((doc.height - heading_height - CANVAS_HEADER_HEIGHT) // CANVAS_ROW_HEIGHT))
+    page_rows = max(1, int((doc.height - CANVAS_HEADER_HEIGHT) // CANVAS_ROW_HEIGHT))
+    
+    row_start = 0
+    while True:
+        if row_start == 0:
+            canvas.setFont('Helvetica-Bold', 14)
+            canvas.drawString(doc.leftMargin, top - 14, "Detailed Data")
+            row_end = min(first_page_rows, len(table_rows))
+            table_top = top - heading_height
+        else:
+            row_end = min(row_start + page_rows, len(table_rows))
+            table_top = top
+        
+        page_columns = [cells[row_start:row_end] for cells in columns]
+        _draw_canvas_table_page(canvas, doc.leftMargin, table_top, table_fields, page_columns, col_widths, row_start)
+        _draw_page_number_text(canvas, page_number, doc.pagesize)
+        canvas.showPage()
+        page_number += 1
+        
+        row_start = row_end
+        if row_start >= len(table_rows):
+            break
+    
+    canvas.save()
 
 def generate_pdf_report(report_title, results, report_config=None, execution_date=None):
     """
@@ -217,7 +2595,9 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
     
     Args:
         report_title (str): Report title
-        results (list): Data results from API
+        results (list, pandas.DataFrame or pyarrow.Table): Data results from API; an Arrow
+            table (e.g. from open_arrow_results()) is summarized and rendered batch by
+            batch without converting it to Python dicts
         report_config (dict, optional): Report configuration
         execution_date (datetime, optional): Execution date for the report
         
@@ -232,7 +2612,7 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
     pdf_file = f"/tmp/{report_id}_{execution_date.strftime('%Y%m%d')}.pdf"
     
     # Handle empty results
-    if not results:
+    if results is None or len(results) == 0:
         logger.warning(f"No results found for report generation: {report_title}")
         # Create an empty PDF with a message
         doc = SimpleDocTemplate(pdf_file, pagesize=letter)
@@ -249,10 +2629,11 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
         report_fields = report_config["report_fields"]
     else:
         # Use all fields from the first result
-        report_fields = list(results[0].keys())
+        report_fields = _column_names(results) if _is_tabular(results) else list(results[0].keys())
     
-    # Create a DataFrame from the results
-    df = pd.DataFrame(results)
+    # Create a DataFrame from the results; Arrow tables are kept as they are
+    df = results if _is_tabular(results) else pd.DataFrame(results)
+    df_columns = _column_names(df)
     
     # Generate the PDF
     doc = SimpleDocTemplate(pdf_file, pagesize=landscape(letter))
@@ -282,28 +2663,28 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
             label = summary_field["label"]
             
             # Skip if field doesn't exist in the data
-            if field not in df.columns:
+            if field not in df_columns:
                 continue
                 
             try:
                 # Calculate summary statistic based on operation
                 if operation == "sum":
-                    value = df[field].sum()
+                    value = _column_stat(df, field, "sum")
                     if isinstance(value, (int, float)):
                         value_str = f"{value:,.2f}" if isinstance(value, float) else f"{value:,}"
                     else:
                         value_str = str(value)
                 elif operation == "avg" or operation == "mean":
-                    value = df[field].mean()
+                    value = _column_stat(df, field, "mean")
                     value_str = f"{value:,.2f}"
                 elif operation == "count":
                     value = len(df)
                     value_str = f"{value:,}"
                 elif operation == "min":
-                    value = df[field].min()
+                    value = _column_stat(df, field, "min")
                     value_str = str(value)
                 elif operation == "max":
-                    value = df[field].max()
+                    value = _column_stat(df, field, "max")
                     value_str = str(value)
                 elif operation == "group":
                     # Skip in summary table, will create chart instead
@@ -339,12 +2720,12 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
                 label = summary_field["label"]
                 
                 # Skip if field doesn't exist in the data
-                if field not in df.columns:
+                if field not in df_columns:
                     continue
                     
                 try:
                     # Count values in the field
-                    value_counts = df[field].value_counts().head(10)  # Limit to top 10
+                    value_counts = _value_counts(df, field, 10)  # Limit to top 10
                     
                     # Create chart
                     plt.figure(figsize=(8, 4))
@@ -373,36 +2754,31 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
                     continue
     
     # Add main table with data
-    elements.append(Paragraph("Detailed Data", styles['Heading2']))
+    detail_heading = Paragraph("Detailed Data", styles['Heading2'])
     
     # Prepare table data
     # Filter to only include configured fields or all available fields
-    table_fields = [field for field in report_fields if field in df.columns]
-    
-    # Add header row with field names
-    table_data = [table_fields]
-    
-    # Add data rows
-    for _, row in df.iterrows():
-        table_row = []
-        for field in table_fields:
-            value = row.get(field, "")
-            if isinstance(value, (int, float)):
-                if isinstance(value, float):
-                    formatted_value = f"{value:,.2f}"
-                else:
-                    formatted_value = f"{value:,}"
-            else:
-                formatted_value = str(value)
-            table_row.append(formatted_value)
-        table_data.append(table_row)
+    table_fields = [field for field in report_fields if field in df_columns]
+    
+    # Add data rows, formatted column by column
+    table_rows = []
+    for frame in _iter_frames(df, table_fields):
+        table_rows.extend(format_table_rows(frame, table_fields))
     
-    # Create table with appropriate column widths
+    # Create tables with appropriate column widths
     col_widths = [max(100, min(200, 600 // len(table_fields)))] * len(table_fields)
-    table = Table(table_data, colWidths=col_widths, repeatRows=1)
+    
+    # Plain tabular reports can skip Platypus table layout and draw rows directly
+    render_engine = report_config.get("render_engine", "platypus") if report_config else "platypus"
+    if render_engine == "canvas":
+        _build_pdf_canvas(doc, elements, table_fields, table_rows, col_widths)
+        logger.info(f"PDF report generated: {pdf_file}")
+        return pdf_file
+    if render_engine != "platypus":
+        raise Exception(f"Unknown render engine: {render_engine}")
     
     # Style the table
-    table_style = TableStyle([
+    table_style = [
         ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -415,18 +2791,52 @@ def generate_pdf_report(report_title, results, report_config=None, execution_dat
         ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
         ('GRID', (0, 0), (-1, -1), 1, colors.black),
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ])
+    ]
+    
+    # Split large detail sections into page-sized tables that each repeat the
+    # header, so layout cost grows linearly with the row count
+    first_chunk_rows, chunk_rows, new_page = _detail_chunk_sizes(
+        doc, elements, detail_heading, table_fields, table_rows, col_widths, table_style
+    )
+    if report_config and report_config.get("detail_chunk_rows"):
+        first_chunk_rows = chunk_rows = int(report_config["detail_chunk_rows"])
+    
+    if len(table_rows) > first_chunk_rows:
+        chunk_bounds = [(0, first_chunk_rows)] + [
+            (chunk_start, min(chunk_start + chunk_rows, len(table_rows)))
+            for chunk_start in range(first_chunk_rows, len(table_rows), chunk_rows)
+        ]
+    else:
+        chunk_bounds = [(0, len(table_rows))]
+    
+    # The first chunk fills the rest of the last summary page unless not even a row fits there
+    if new_page:
+        elements.append(PageBreak())
+    elements.append(detail_heading)
+    
+    # Multi-chunk detail sections can be rendered in parallel processes
+    render_workers = int(report_config.get("render_workers", 1)) if report_config else 1
+    if render_workers > 1 and len(chunk_bounds) > 1 and importlib.util.find_spec("pypdf") is None:
+        logger.warning("Parallel PDF rendering requires pypdf (pip install pypdf), rendering serially")
+        render_workers = 1
+    
+    if render_workers > 1 and len(chunk_bounds) > 1 and multiprocessing.current_process().daemon:
+        # e.g. tasks run by the LocalExecutor, whose daemonic workers cannot have children
+        logger.warning("Parallel PDF rendering is not possible in a daemonic process, rendering serially")
+        render_workers = 1
     
-    # Add a zebra striping pattern
-    for i in range(1, len(table_data)):
-        if i % 2 == 0:
-            table_style.add('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
+    detail_bounds = chunk_bounds
+    if render_workers > 1 and len(chunk_bounds) > 1:
+        elements.extend(_detail_tables(table_fields, table_rows, chunk_bounds[:1], col_widths, table_style))
+        detail_bounds = chunk_bounds[1:]
+        if _build_pdf_parallel(doc, elements, table_fields, table_rows, detail_bounds, col_widths, table_style, render_workers):
+            logger.info(f"PDF report generated: {pdf_file}")
+            return pdf_file
     
-    table.setStyle(table_style)
-    elements.append(table)
+    elements.extend(_detail_tables(table_fields, table_rows, detail_bounds, col_widths, table_style))
     
     # Build the PDF
-    doc.build(elements)
+    doc.build(elements, onFirstPage=_draw_page_number, onLaterPages=_draw_page_number)
     
     logger.info(f"PDF report generated: {pdf_file}")
     return pdf_file
\ No newline at end of file